@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Бенчмарк утренней рассылки против локального сервера Bot API
+Создаёт базу с N пользователями, рассылает утреннюю цитату через планировщик
+исходящих сообщений и проверяет продолжение после прерывания;
+отчёт: сообщений в секунду, прогноз при лимите Telegram, рост памяти, дубли.
+
+    python benchmarks/broadcast_bench.py --users 100000
+    python benchmarks/broadcast_bench.py --users 20000 --interrupt-after 10 --chunk 500
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import FakeTelegramServer, rss_mb  # noqa: E402
+
+
+class RecordingServer(FakeTelegramServer):
+    """Сервер Bot API, который запоминает, сколько сообщений получил каждый чат"""
+
+    def __init__(self):
+        super().__init__(0, 0, 0.0, 0.0, {}, None)
+        self.deliveries: Counter = Counter()
+
+    async def _call(self, method: str, params: Dict, body: Dict):
+        if method == "sendMessage":
+            self.deliveries[int(body["chat_id"])] += 1
+        return await super()._call(method, params, body)
+
+
+def seed_users(db_path: str, users: int, seed_value: int):
+    """Пользователи и их прогресс одной транзакцией sqlite3"""
+    rng = random.Random(seed_value)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (user_id, username) VALUES (?, ?)",
+            ((10 ** 6 + index, f"user{index}") for index in range(users))
+        )
+        conn.executemany(
+            "INSERT INTO user_progress (user_id, total_interventions, current_streak, last_intervention_date) "
+            "VALUES (?, ?, ?, ?)",
+            ((10 ** 6 + index, rng.randrange(200), rng.randrange(30),
+              (today - timedelta(days=rng.randrange(10))).isoformat())
+             for index in range(users) if rng.random() < 0.7)
+        )
+    conn.close()
+
+
+async def run(args) -> Dict:
+    from broadcast import MorningBroadcast
+    from db_pool import ConnectionManager
+    from motivation_quotes import MotivationQuotesGenerator
+    from outbound import OutboundScheduler
+    from simple_bot import SimpleDearCraveBreakerBot
+    from telegram_api import TelegramAPIClient
+
+    server = RecordingServer()
+    server.run_in_thread()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "broadcast.db")
+    bot = SimpleDearCraveBreakerBot(db_path=db_path)
+    await bot.init_db()
+    await bot.db.close()
+    seed_users(db_path, args.users, args.seed)
+
+    db = ConnectionManager(db_path)
+    api = TelegramAPIClient("0:broadcast-bench", f"http://127.0.0.1:{server.port}")
+    outbound = OutboundScheduler(api, global_rate=args.rate or None)
+    job = MorningBroadcast(db, outbound, MotivationQuotesGenerator(backend=None), chunk_size=args.chunk)
+    memory_before = rss_mb()
+    memory_peak = memory_before
+
+    async def sample_memory():
+        nonlocal memory_peak
+        while True:
+            memory_peak = max(memory_peak, rss_mb())
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+    interrupted = False
+    if args.interrupt_after:
+        # Остановка посреди страницы: как перезапуск процесса во время рассылки
+        task = asyncio.create_task(job.run())
+        target = args.interrupt_after * args.chunk + args.chunk // 2
+        while sum(server.deliveries.values()) < target and not task.done():
+            await asyncio.sleep(0.01)
+        if task.done():
+            # Рассылка закончилась (или упала) раньше точки прерывания
+            task.result()
+        else:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            interrupted = True
+    report = await job.run()
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    await outbound.stop()
+    await api.close()
+    await db.close()
+
+    sent = sum(server.deliveries.values())
+    return {
+        "users": args.users,
+        "report": report,
+        "elapsed": elapsed,
+        "per_sec": sent / elapsed if elapsed else 0.0,
+        "telegram_hours": args.users / 30 / 3600,
+        "missing": args.users - len(server.deliveries),
+        "duplicates": sum(count - 1 for count in server.deliveries.values() if count > 1),
+        "interrupted": interrupted,
+        "memory_before": memory_before,
+        "memory_peak": memory_peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000, help="пользователей в базе")
+    parser.add_argument("--chunk", type=int, default=200, help="пользователей на страницу")
+    parser.add_argument("--rate", type=float, default=100_000.0,
+                        help="глобальный лимит сообщений в секунду (0 - TELEGRAM_GLOBAL_RATE)")
+    parser.add_argument("--interrupt-after", type=int, default=0,
+                        help="прервать рассылку на странице N и продолжить (проверка checkpoint)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.interrupt_after and args.interrupt_after * args.chunk >= args.users:
+        parser.error(f"--interrupt-after {args.interrupt_after} при --chunk {args.chunk}: "
+                     f"страниц всего {-(-args.users // args.chunk)}, прерывать нечего")
+
+    os.environ["LLM_BACKEND"] = "none"
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "0:broadcast-bench")
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(run(args))
+
+    report = result["report"]
+    print(f"Пользователей:        {result['users']}, отправлено {report['sent']}, ошибок {report['failed']}, "
+          f"заблокировали {report['blocked']}, завершена: {report['finished']}")
+    print(f"Время:                {result['elapsed']:.1f} с ({result['per_sec']:.0f} сообщений/с); "
+          f"при лимите Telegram 30/с - {result['telegram_hours']:.2f} ч")
+    print(f"Не получили / дубли:  {result['missing']} / {result['duplicates']}"
+          + (" (после прерывания)" if result["interrupted"] else ""))
+    print(f"Память (RSS):         {result['memory_before']:.1f} -> пик {result['memory_peak']:.1f} МБ "
+          f"(+{result['memory_peak'] - result['memory_before']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Микробенчмарк слоя данных SQLite
+Заполняет базу синтетическими пользователями и событиями и замеряет методы доступа
+(бот и database.Database) на холодных и прогретых соединениях; сравнение с сохранённым
+базовым прогоном завершается с кодом 1 при регрессии больше порога.
+
+    python benchmarks/db_bench.py --scale 10k --save baseline.json
+    python benchmarks/db_bench.py --scale 10k --baseline baseline.json --threshold 0.25
+    python benchmarks/db_bench.py --scale 1m --target database --data-dir /var/tmp/bench
+
+Масштабы: 10k (100 тыс. событий), 100k (1 млн), 1m (10 млн). Заполненные базы
+сохраняются в --data-dir и переиспользуются. «Холодный» замер - первый вызов
+после закрытия соединений: включает их открытие и пустой page cache SQLite
+(кэш ОС остаётся тёплым).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motivation_bench import percentile  # noqa: E402
+from stats import utc_now  # noqa: E402
+
+SCALES = {
+    "10k": (10_000, 100_000),
+    "100k": (100_000, 1_000_000),
+    "1m": (1_000_000, 10_000_000),
+}
+
+# Схемы различаются: у бота interventions и описание триггера, у Database - intervention_outcomes
+TARGETS = {
+    "bot": {"outcomes": "interventions", "trigger_description": True},
+    "database": {"outcomes": "intervention_outcomes", "trigger_description": False},
+}
+
+TECHNIQUES = ("breathing", "meditation", "coaching", "game", "impulse", "emergency")
+TRIGGER_NAMES = ("stress", "boredom", "fatigue", "company", "evening", "social_media")
+HISTORY_DAYS = 120
+CHUNK = 100_000
+
+
+def create_target(target: str, db_path: str):
+    """Бот или Database поверх файла db_path"""
+    if target == "bot":
+        from simple_bot import SimpleDearCraveBreakerBot
+        return SimpleDearCraveBreakerBot(db_path=db_path)
+    from database import Database
+    return Database(db_path)
+
+
+def _active_user(rng: random.Random, users: int) -> int:
+    # Активность неравномерная: небольшая доля пользователей даёт большую часть событий
+    return 1 + int(users * rng.random() ** 3)
+
+
+def _timestamps(rng: random.Random, now: datetime):
+    span = HISTORY_DAYS * 86400
+    while True:
+        yield (now - timedelta(seconds=rng.randrange(span))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _insert_chunked(conn: sqlite3.Connection, sql: str, rows, total: int, label: str):
+    written = 0
+    while written < total:
+        size = min(CHUNK, total - written)
+        conn.executemany(sql, (next(rows) for _ in range(size)))
+        conn.commit()
+        written += size
+        print(f"\r  {label}: {written:,}/{total:,}", end="", flush=True)
+    print()
+
+
+async def seed(target: str, db_path: str, users: int, events: int, seed_value: int):
+    """Схема через init_db цели, затем массовая вставка и пересчёт счётчиков"""
+    from counters import UserCounters
+
+    spec = TARGETS[target]
+    outcomes = spec["outcomes"]
+    instance = create_target(target, db_path)
+    await instance.init_db()
+    await instance.db.close()
+
+    rng = random.Random(seed_value)
+    now = utc_now()
+    stamps = _timestamps(rng, now)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    # Триггеры счётчиков на каждую строку замедляют заполнение в разы - пересчитаем в конце
+    for trigger in ("trg_help_requests_counters", f"trg_{outcomes}_counters_insert",
+                    f"trg_{outcomes}_counters_success"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.commit()
+
+    started = time.perf_counter()
+    _insert_chunked(conn, "INSERT OR IGNORE INTO users (user_id, username, created_at) VALUES (?, ?, ?)",
+                    ((uid, f"user{uid}", next(stamps)) for uid in range(1, users + 1)), users, "users")
+
+    def progress_rows():
+        for uid in range(1, users + 1):
+            total = int(rng.expovariate(1 / 20))
+            streak = rng.randrange(0, 15)
+            counts = {t: rng.randrange(1, 10) for t in rng.sample(TECHNIQUES, rng.randrange(0, 4))}
+            yield (uid, total, streak, max(streak, rng.randrange(0, 30)),
+                   (now - timedelta(days=rng.randrange(0, 30))).strftime("%Y-%m-%d"), json.dumps(counts))
+    _insert_chunked(conn, """INSERT OR IGNORE INTO user_progress
+                             (user_id, total_interventions, current_streak, longest_streak,
+                              last_intervention_date, technique_counts)
+                             VALUES (?, ?, ?, ?, ?, ?)""", progress_rows(), users, "user_progress")
+
+    requests, triggers = int(events * 0.3), int(events * 0.1)
+    attempts = events - requests - triggers
+    _insert_chunked(conn, "INSERT INTO help_requests (user_id, created_at) VALUES (?, ?)",
+                    ((_active_user(rng, users), next(stamps)) for _ in count()), requests, "help_requests")
+    _insert_chunked(conn, f"INSERT INTO {outcomes} (user_id, success, created_at) VALUES (?, ?, ?)",
+                    ((_active_user(rng, users), rng.random() < 0.6, next(stamps)) for _ in count()),
+                    attempts, outcomes)
+    if spec["trigger_description"]:
+        _insert_chunked(conn, "INSERT INTO user_triggers (user_id, trigger_name, description, created_at) VALUES (?, ?, ?, ?)",
+                        ((_active_user(rng, users), rng.choice(TRIGGER_NAMES), "seed", next(stamps))
+                         for _ in count()), triggers, "user_triggers")
+    else:
+        _insert_chunked(conn, "INSERT INTO user_triggers (user_id, trigger_name, created_at) VALUES (?, ?, ?)",
+                        ((_active_user(rng, users), rng.choice(TRIGGER_NAMES), next(stamps))
+                         for _ in count()), triggers, "user_triggers")
+    conn.execute("""
+        INSERT OR IGNORE INTO user_technique_counters (user_id, technique, count)
+        SELECT p.user_id, t.key, t.value FROM user_progress p, json_each(p.technique_counts) t
+    """)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    # Пересчёт счётчиков возвращает и триггеры
+    instance = create_target(target, db_path)
+    await UserCounters(instance.db, outcomes).rebuild()
+    await instance.db.close()
+    print(f"  заполнено за {time.perf_counter() - started:.1f} с, "
+          f"{os.path.getsize(db_path) / 2 ** 20:.0f} МБ")
+
+
+Case = Tuple[str, Callable[[object, int], Awaitable]]
+
+
+def bot_cases() -> List[Case]:
+    async def record_trigger(bot, uid):
+        await bot.record_trigger(uid, "stress", "bench")
+        await bot.events.flush()
+
+    async def update_user_progress(bot, uid):
+        progress = await bot.get_user_progress(uid)
+        await bot.update_user_progress(uid, progress)
+
+    return [
+        ("user_exists", lambda bot, uid: bot.user_exists(uid)),
+        ("get_user_progress", lambda bot, uid: bot.get_user_progress(uid)),
+        ("update_user_progress", update_user_progress),
+        ("process_intervention_success", lambda bot, uid: bot.process_intervention_success(uid, "breathing")),
+        ("record_trigger+flush", record_trigger),
+        ("get_user_triggers", lambda bot, uid: bot.get_user_triggers(uid)),
+        ("stats.get_user_summary", lambda bot, uid: bot.stats.get_user_summary(uid)),
+        ("stats.get_progress_summary", lambda bot, uid: bot.stats.get_progress_summary(uid)),
+        ("stats.get_history(day, 30)", lambda bot, uid: bot.stats.get_history(uid, 30, "day")),
+        ("stats.get_history(week, 12)", lambda bot, uid: bot.stats.get_history(uid, 12, "week")),
+        ("stats.get_history(month, 6)", lambda bot, uid: bot.stats.get_history(uid, 6, "month")),
+        ("get_total_user_count", lambda bot, uid: bot.get_total_user_count()),
+    ]
+
+
+def database_cases() -> List[Case]:
+    async def update_user_progress(database, uid):
+        progress = await database.get_user_progress(uid)
+        await database.update_user_progress(uid, progress)
+
+    return [
+        ("user_exists", lambda database, uid: database.user_exists(uid)),
+        ("get_user_progress", lambda database, uid: database.get_user_progress(uid)),
+        ("update_user_progress", update_user_progress),
+        ("add_user_trigger", lambda database, uid: database.add_user_trigger(uid, "stress")),
+        ("get_user_triggers", lambda database, uid: database.get_user_triggers(uid)),
+        ("log_intervention_outcome(durable)", lambda database, uid: database.log_intervention_outcome(uid, True, durable=True)),
+        ("get_user_stats", lambda database, uid: database.get_user_stats(uid)),
+        ("get_daily_stats(day, 7)", lambda database, uid: database.get_daily_stats(uid, 7)),
+        ("get_daily_stats(week, 12)", lambda database, uid: database.get_daily_stats(uid, 12, "week")),
+    ]
+
+
+async def measure(instance, cases: List[Case], users: int, iterations: int, cold_runs: int,
+                  rng: random.Random) -> Dict[str, Dict]:
+    results = {}
+    for name, call in cases:
+        cold = []
+        for _ in range(cold_runs):
+            # Новые соединения - пустой page cache SQLite
+            await instance.db.close()
+            uid = _active_user(rng, users)
+            started = time.perf_counter()
+            await call(instance, uid)
+            cold.append(time.perf_counter() - started)
+
+        for _ in range(min(20, iterations)):
+            await call(instance, _active_user(rng, users))
+        warm = []
+        for _ in range(iterations):
+            uid = _active_user(rng, users)
+            started = time.perf_counter()
+            await call(instance, uid)
+            warm.append(time.perf_counter() - started)
+
+        results[name] = {
+            "cold": percentile(cold, 50),
+            "p50": percentile(warm, 50),
+            "p95": percentile(warm, 95),
+            "p99": percentile(warm, 99),
+        }
+        print(f"  {name:36} cold {results[name]['cold'] * 1000:9.3f}  p50 {results[name]['p50'] * 1000:8.3f}  "
+              f"p95 {results[name]['p95'] * 1000:8.3f}  p99 {results[name]['p99'] * 1000:8.3f} мс")
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, min_delta: float) -> List[str]:
+    """Регрессии: медленнее базового больше чем на threshold (и больше min_delta секунд)"""
+    regressions = []
+    for target, cases in results.items():
+        for name, current in cases.items():
+            previous = baseline.get(target, {}).get(name)
+            if previous is None:
+                continue
+            for metric in ("cold", "p50"):
+                before, after = previous[metric], current[metric]
+                if after > before * (1 + threshold) and after - before > min_delta:
+                    regressions.append(f"{target}/{name} {metric}: {before * 1000:.3f} -> {after * 1000:.3f} мс "
+                                       f"(+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+async def run(args) -> Dict:
+    users, events = SCALES[args.scale]
+    users = args.users or users
+    events = args.events or events
+    os.makedirs(args.data_dir, exist_ok=True)
+    targets = list(TARGETS) if args.target == "all" else [args.target]
+
+    results = {}
+    for target in targets:
+        db_path = os.path.join(args.data_dir, f"{target}-{users}u-{events}e-s{args.seed}.db")
+        if not os.path.exists(db_path + ".done"):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            print(f"Заполнение {db_path}: {users:,} пользователей, {events:,} событий")
+            await seed(target, db_path, users, events, args.seed)
+            open(db_path + ".done", "w").close()
+
+        print(f"{target}: {users:,} пользователей, {events:,} событий")
+        instance = create_target(target, db_path)
+        await instance.init_db()
+        cases = bot_cases() if target == "bot" else database_cases()
+        if args.only:
+            cases = [case for case in cases if any(part in case[0] for part in args.only)]
+        try:
+            results[target] = await measure(instance, cases, users, args.iterations, args.cold_runs,
+                                            random.Random(args.seed))
+        finally:
+            if target == "bot":
+                await instance.events.flush()
+            await instance.db.close()
+    return {"scale": {"users": users, "events": events}, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="пользователей (и событий) в базе")
+    parser.add_argument("--users", type=int, default=0, help="переопределить число пользователей")
+    parser.add_argument("--events", type=int, default=0, help="переопределить число событий")
+    parser.add_argument("--target", choices=("all",) + tuple(TARGETS), default="all")
+    parser.add_argument("--only", nargs="*", help="только методы, содержащие эти подстроки")
+    parser.add_argument("--iterations", type=int, default=200, help="прогретых вызовов на метод")
+    parser.add_argument("--cold-runs", type=int, default=3, help="холодных вызовов на метод (медиана)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "cravebreaker-bench"),
+                        help="каталог заполненных баз")
+    parser.add_argument("--save", help="сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON базового прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимое замедление (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.0005,
+                        help="игнорировать замедление меньше стольких секунд (шум)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LLM_BACKEND", "none")
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Результаты сохранены: {args.save}")
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        if baseline.get("scale") != report["scale"]:
+            print(f"Внимание: масштаб базового прогона {baseline.get('scale')} отличается от {report['scale']}")
+        regressions = compare(report["results"], baseline.get("results", {}), args.threshold, args.min_delta)
+        if regressions:
+            print(f"Регрессии (порог {args.threshold * 100:.0f}%):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"Регрессий нет (порог {args.threshold * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Нагрузочный тест бота против локального сервера Bot API
+Сервер в отдельном потоке отдаёт getUpdates от N синтетических пользователей
+(меню -> импульс -> техника -> результат) и записывает ответы бота;
+отчёт: обновлений в секунду, задержка по маршрутам, ошибки SQLite, рост памяти.
+
+    python benchmarks/load_test.py --users 100 --sessions 5
+    python benchmarks/load_test.py --users 500 --think 0.5 --workers 16
+    python benchmarks/load_test.py --llm standin --tracemalloc
+    python benchmarks/load_test.py --telegram-limits --flood 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motivation_bench import percentile  # noqa: E402
+
+Step = Tuple[str, str]  # ("message", текст) или ("callback", callback_data)
+
+
+def rss_mb() -> float:
+    """Текущий RSS процесса (Linux), иначе пиковый"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def user_flow(rng: random.Random, sessions: int, techniques: Dict[str, int]) -> Iterator[Step]:
+    """Сценарий одного пользователя: /start и sessions сессий разного вида"""
+    yield "message", "/start"
+    impulse_types = sorted(techniques)
+    for _ in range(sessions):
+        scenario = rng.random()
+        if scenario < 0.6:
+            # Импульс: выбор типа, техника, при неудаче - другая техника
+            impulse = rng.choice(impulse_types)
+            yield "callback", "emergency_help"
+            yield "callback", "my_impulses"
+            yield "callback", f"impulse_{impulse}"
+            yield "callback", f"technique_{impulse}_{rng.randrange(techniques[impulse])}"
+            if rng.random() < 0.3:
+                yield "callback", f"impulse_failed_{impulse}"
+                yield "callback", f"technique_{impulse}_{rng.randrange(techniques[impulse])}"
+            yield "callback", f"impulse_success_{impulse}"
+        elif scenario < 0.8:
+            # Быстрая интервенция из главного меню и оценка результата
+            yield "callback", rng.choice(("intervention_breathing", "intervention_meditation",
+                                          "intervention_coaching", "intervention_game"))
+            yield "callback", rng.choice(("outcome_success", "outcome_success", "outcome_failed"))
+        else:
+            # Проверка прогресса и мотивация
+            yield rng.choice((("callback", "show_stats"), ("message", "/stats"),
+                              ("callback", "daily_motivation"), ("callback", "evening_reflection")))
+        yield "callback", "back_to_menu"
+
+
+class FakeTelegramServer:
+    """Минимальный HTTP/1.1 сервер Bot API с keep-alive.
+
+    getUpdates - long polling по очереди синтетических обновлений,
+    sendMessage/editMessageText завершают шаг пользователя (первый ответ
+    в его чат), answerCallbackQuery отмечает снятие «часиков» у кнопки.
+    С ``flood`` > 0 такая доля sendMessage/editMessageText получает 429
+    с ``retry_after`` - проверка повторов планировщика исходящих сообщений.
+    """
+
+    def __init__(self, users: int, sessions: int, think: float, reply_timeout: float,
+                 techniques: Dict[str, int], route_of, seed: int = 0,
+                 flood: float = 0.0, retry_after: int = 1):
+        self.users = users
+        self.sessions = sessions
+        self.think = think
+        self.reply_timeout = reply_timeout
+        self.techniques = techniques
+        self.route_of = route_of
+        self.seed = seed
+        self.flood = flood
+        self.retry_after = retry_after
+        self.rate_limited = 0
+        self._flood_rng = random.Random(seed)
+        self.port: Optional[int] = None
+        self.ready = threading.Event()
+        self.finished = threading.Event()
+        self.calls: Counter = Counter()
+        self.latencies: Dict[str, List[float]] = {}
+        self.ack_latencies: List[float] = []
+        self.lost = 0
+        self.steps = 0
+        self.elapsed = 0.0
+        self._updates: List[Dict] = []
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._update_event: Optional[asyncio.Event] = None
+        self._replies: Dict[int, asyncio.Future] = {}
+        self._acks: Dict[str, float] = {}
+
+    def run_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=lambda: asyncio.run(self._main()), name="fake-telegram", daemon=True)
+        thread.start()
+        self.ready.wait()
+        return thread
+
+    async def _main(self):
+        self._update_event = asyncio.Event()
+        server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        async with server:
+            started = time.perf_counter()
+            await asyncio.gather(*(self._user(index) for index in range(self.users)))
+            self.elapsed = time.perf_counter() - started
+            self.finished.set()
+            # Держим сервер, пока бот не закончит последний long polling
+            await asyncio.sleep(3600)
+
+    async def _user(self, index: int):
+        rng = random.Random(self.seed * 100003 + index)
+        chat_id = 10 ** 6 + index
+        # Пользователи приходят не одновременно
+        await asyncio.sleep(rng.uniform(0, self.think))
+        for kind, payload in user_flow(rng, self.sessions, self.techniques):
+            reply = asyncio.get_running_loop().create_future()
+            self._replies[chat_id] = reply
+            started = time.perf_counter()
+            self._push(self._make_update(chat_id, kind, payload, started))
+            try:
+                await asyncio.wait_for(reply, self.reply_timeout)
+            except asyncio.TimeoutError:
+                self.lost += 1
+                self._replies.pop(chat_id, None)
+                continue
+            route = self.route_of(kind, payload)
+            self.latencies.setdefault(route, []).append(time.perf_counter() - started)
+            self.steps += 1
+            if self.think:
+                await asyncio.sleep(rng.expovariate(1 / self.think))
+
+    def _make_update(self, chat_id: int, kind: str, payload: str, started: float) -> Dict:
+        update_id = self._next_update_id
+        self._next_update_id += 1
+        user = {"id": chat_id, "is_bot": False, "first_name": "Load", "username": f"load{chat_id}"}
+        chat = {"id": chat_id, "type": "private"}
+        if kind == "message":
+            return {"update_id": update_id, "message": {
+                "message_id": update_id, "from": user, "chat": chat, "date": int(time.time()), "text": payload
+            }}
+        query_id = str(update_id)
+        self._acks[query_id] = started
+        return {"update_id": update_id, "callback_query": {
+            "id": query_id, "from": user, "data": payload, "chat_instance": str(chat_id),
+            "message": {"message_id": 1, "chat": chat, "date": int(time.time())}
+        }}
+
+    def _push(self, update: Dict):
+        self._updates.append(update)
+        self._update_event.set()
+
+    async def _get_updates(self, params: Dict) -> List[Dict]:
+        offset = int(params.get("offset", 0))
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates:
+            self._update_event.clear()
+            try:
+                await asyncio.wait_for(self._update_event.wait(), float(params.get("timeout", 0)))
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:int(params.get("limit", 100))]
+
+    def _reply(self, body: Dict) -> Dict:
+        chat_id = int(body.get("chat_id", 0))
+        reply = self._replies.pop(chat_id, None)
+        if reply is not None and not reply.done():
+            reply.set_result(None)
+        self._next_message_id += 1
+        return {"message_id": body.get("message_id", self._next_message_id), "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"}, "text": body.get("text", "")}
+
+    async def _call(self, method: str, params: Dict, body: Dict):
+        self.calls[method] += 1
+        if method == "getUpdates":
+            return await self._get_updates(params)
+        if method in ("sendMessage", "editMessageText"):
+            return self._reply(body)
+        if method == "answerCallbackQuery":
+            started = self._acks.pop(body.get("callback_query_id"), None)
+            if started is not None:
+                self.ack_latencies.append(time.perf_counter() - started)
+        return True
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0)))
+                path, _, query = target.partition("?")
+                params = {key: values[-1] for key, values in parse_qs(query).items()}
+                body = json.loads(raw) if raw else {}
+                method = path.rsplit("/", 1)[-1]
+                if self.flood and method in ("sendMessage", "editMessageText") and \
+                        self._flood_rng.random() < self.flood:
+                    self.rate_limited += 1
+                    status = b"429 Too Many Requests"
+                    response = {"ok": False, "error_code": 429,
+                                "description": f"Too Many Requests: retry after {self.retry_after}",
+                                "parameters": {"retry_after": self.retry_after}}
+                else:
+                    status = b"200 OK"
+                    response = {"ok": True, "result": await self._call(method, params, body)}
+                payload = json.dumps(response).encode("utf-8")
+                writer.write(b"HTTP/1.1 %s\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (status, len(payload), payload))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class ErrorLogCounter(logging.Handler):
+    """Считает ошибки в логах бота, отдельно - занятость SQLite"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.errors = 0
+        self.busy = 0
+        self.samples: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if record.levelno >= logging.ERROR:
+            self.errors += 1
+            if len(self.samples) < 5:
+                self.samples.append(message[:200])
+        if "database is locked" in message or "database is busy" in message:
+            self.busy += 1
+
+
+async def run_load_test(args) -> Dict:
+    from content import IMPULSE_INTERVENTIONS
+    from metrics import metrics
+    from simple_bot import COMMANDS, SimpleDearCraveBreakerBot, callback_router
+
+    def route_of(kind: str, payload: str) -> str:
+        if kind == "message":
+            return next((command for command in COMMANDS if payload.startswith(command)), "text")
+        match = callback_router.resolve(payload)
+        return match[0] if match else "unknown"
+
+    techniques = {name: len(impulse["techniques"]) for name, impulse in IMPULSE_INTERVENTIONS.items()}
+    server = FakeTelegramServer(args.users, args.sessions, args.think, args.reply_timeout,
+                                techniques, route_of, seed=args.seed, flood=args.flood)
+    server.run_in_thread()
+
+    errors = ErrorLogCounter()
+    logging.getLogger().addHandler(errors)
+    metrics.reset()
+
+    bot = SimpleDearCraveBreakerBot(db_path=os.path.join(tempfile.mkdtemp(), "load.db"),
+                                    api_url=f"http://127.0.0.1:{server.port}")
+    bot.poll_timeout = 1
+    if args.workers:
+        bot.dispatcher.concurrency = args.workers
+    if args.tracemalloc:
+        tracemalloc.start()
+    memory_before = rss_mb()
+    snapshot_before = tracemalloc.take_snapshot() if args.tracemalloc else None
+
+    task = asyncio.create_task(bot.run_bot())
+    await asyncio.to_thread(server.finished.wait)
+    bot.stop()
+    await task
+
+    memory_after = rss_mb()
+    top_growth = []
+    if args.tracemalloc:
+        stats = tracemalloc.take_snapshot().compare_to(snapshot_before, "lineno")
+        top_growth = [str(stat) for stat in stats[:5]]
+        tracemalloc.stop()
+    logging.getLogger().removeHandler(errors)
+
+    routes = {
+        route: {"count": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95),
+                "p99": percentile(values, 99), "max": max(values)}
+        for route, values in server.latencies.items()
+    }
+    return {
+        "users": args.users,
+        "steps": server.steps,
+        "lost": server.lost,
+        "elapsed": server.elapsed,
+        "updates_per_sec": server.steps / server.elapsed if server.elapsed else 0.0,
+        "all": [value for values in server.latencies.values() for value in values],
+        "routes": routes,
+        "ack": server.ack_latencies,
+        "calls": dict(server.calls),
+        "rate_limited": server.rate_limited,
+        "outbound_retries": metrics.total("outbound_retries_total"),
+        "outbound_dropped": metrics.total("outbound_dropped_total"),
+        "errors": errors.errors,
+        "busy": errors.busy,
+        "error_samples": errors.samples,
+        "dispatcher_errors": metrics.total("dispatcher_errors_total"),
+        "db_errors": metrics.total("db_errors_total"),
+        "memory_before": memory_before,
+        "memory_after": memory_after,
+        "top_growth": top_growth,
+    }
+
+
+def print_report(report: Dict):
+    print(f"Пользователей:         {report['users']}, шагов {report['steps']} за {report['elapsed']:.2f} с "
+          f"({report['updates_per_sec']:.1f} обновлений/с), без ответа: {report['lost']}")
+    latencies, acks = report["all"], report["ack"]
+    print(f"Задержка p50/p95/p99:  {percentile(latencies, 50) * 1000:.1f} / {percentile(latencies, 95) * 1000:.1f} / "
+          f"{percentile(latencies, 99) * 1000:.1f} мс")
+    print(f"answerCallbackQuery:   p50 {percentile(acks, 50) * 1000:.1f} мс, p99 {percentile(acks, 99) * 1000:.1f} мс")
+    print(f"Вызовы Bot API:        {report['calls']}")
+    print(f"Исходящие:             429 от сервера {report['rate_limited']}, повторов {report['outbound_retries']:g}, "
+          f"не отправлено {report['outbound_dropped']:g}")
+    print(f"Ошибки:                в логе {report['errors']}, SQLite busy {report['busy']}, "
+          f"диспетчер {report['dispatcher_errors']:g}, откаты БД {report['db_errors']:g}")
+    for sample in report["error_samples"]:
+        print(f"  {sample}")
+    print(f"Память (RSS):          {report['memory_before']:.1f} -> {report['memory_after']:.1f} МБ "
+          f"(+{report['memory_after'] - report['memory_before']:.1f})")
+    for line in report["top_growth"]:
+        print(f"  {line}")
+    print()
+    print(f"{'маршрут':28} {'шагов':>6} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8} {'max мс':>8}")
+    for route, stats in sorted(report["routes"].items(), key=lambda item: -item[1]["p99"]):
+        print(f"{route:28} {stats['count']:6d} {stats['p50'] * 1000:8.1f} {stats['p95'] * 1000:8.1f} "
+              f"{stats['p99'] * 1000:8.1f} {stats['max'] * 1000:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100, help="синтетических пользователей")
+    parser.add_argument("--sessions", type=int, default=5, help="сессий на пользователя")
+    parser.add_argument("--think", type=float, default=0.05, help="средняя пауза между нажатиями, с")
+    parser.add_argument("--reply-timeout", type=float, default=10.0, help="ожидание ответа бота на шаг, с")
+    parser.add_argument("--workers", type=int, default=0, help="воркеров диспетчера (0 - BOT_WORKERS)")
+    parser.add_argument("--llm", choices=("none", "standin"), default="none", help="бэкенд AI-цитат")
+    parser.add_argument("--tracemalloc", action="store_true", help="показать места роста памяти")
+    parser.add_argument("--telegram-limits", action="store_true",
+                        help="лимиты частоты Telegram по умолчанию (иначе сняты: меряется сам бот)")
+    parser.add_argument("--flood", type=float, default=0.0, help="доля ответов 429 на sendMessage/editMessageText")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # До импорта бота: генератор цитат читает окружение при создании
+    os.environ["LLM_BACKEND"] = args.llm
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "0:load-test")
+    if not args.telegram_limits:
+        os.environ.setdefault("TELEGRAM_GLOBAL_RATE", "100000")
+        os.environ.setdefault("TELEGRAM_CHAT_BURST", "100000")
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    print_report(asyncio.run(run_load_test(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Бенчмарк AI-пути мотивационных цитат без сети
+N одновременных пользователей вызывают get_enhanced_personalized_quote (или пул цитат)
+поверх StandInBackend; отчёт: p50/p99 задержки, доля fallback, блокировка event loop.
+
+    python benchmarks/motivation_bench.py --users 50 --requests 500 --latency 0.3
+    python benchmarks/motivation_bench.py --blocking          # как старый синхронный клиент
+    python benchmarks/motivation_bench.py --pool              # через QuotePool
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_backends import StandInBackend  # noqa: E402
+from motivation_quotes import MotivationQuotesGenerator  # noqa: E402
+
+CONTEXTS = ("morning", "evening_reflection")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def random_progress(rng: random.Random) -> Dict:
+    return {
+        "current_streak": rng.choice((0, 2, 5, 12, 30)),
+        "total_interventions": rng.choice((1, 7, 10, 42, 50, 100, 230)),
+        "last_intervention_date": None,
+    }
+
+
+async def monitor_loop(interval: float, lags: List[float], stop: asyncio.Event):
+    """Задержка пробуждения сверх interval - время, когда event loop был занят"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run_benchmark(args) -> Dict:
+    backend = StandInBackend(latency=args.latency, jitter=args.jitter,
+                             failure_rate=args.failure_rate, seed=args.seed,
+                             blocking=args.blocking)
+    generator = MotivationQuotesGenerator(backend=backend)
+    generator.ai_timeout = args.timeout
+    generator.ai_concurrency = args.concurrency
+
+    pool = manager = None
+    if args.pool:
+        from db_pool import ConnectionManager
+        from quote_pool import QuotePool
+        manager = ConnectionManager(os.path.join(tempfile.mkdtemp(), "bench.db"))
+        pool = QuotePool(generator, manager, target_size=args.pool_size)
+        await pool.start()
+        # Прогрев: все ключи запрошены и пул заполнен без задержки бэкенда
+        rng = random.Random(args.seed)
+        for _ in range(200):
+            await pool.get_quote(random_progress(rng), rng.choice(CONTEXTS))
+        backend.latency, backend.jitter, backend.failure_rate = 0.0, 0.0, 0.0
+        while await pool.refill():
+            pass
+        backend.latency, backend.jitter, backend.failure_rate = args.latency, args.jitter, args.failure_rate
+
+    latencies: List[float] = []
+    ai_answers = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+
+    async def user(user_index: int):
+        nonlocal ai_answers
+        rng = random.Random(args.seed + user_index)
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            progress = random_progress(rng)
+            context = rng.choice(CONTEXTS)
+            started = time.perf_counter()
+            if pool is not None:
+                text = await pool.get_quote(progress, context)
+            else:
+                text = await generator.get_enhanced_personalized_quote(progress, context)
+            latencies.append(time.perf_counter() - started)
+            if text.split("\n")[0] in StandInBackend.QUOTES:
+                ai_answers += 1
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop(args.tick, lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(args.users)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    if pool is not None:
+        await pool.stop()
+        await manager.close()
+
+    return {
+        "mode": ("pool" if pool is not None else "direct") + (" (blocking backend)" if args.blocking else ""),
+        "requests": len(latencies),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+        "fallback_rate": 1 - ai_answers / len(latencies) if latencies else 0.0,
+        "loop_blocked": sum(lags),
+        "loop_max_stall": max(lags, default=0.0),
+        "ai_stats": dict(generator.ai_stats),
+    }
+
+
+def print_report(report: Dict):
+    print(f"Режим:                 {report['mode']}")
+    print(f"Запросов:              {report['requests']} за {report['elapsed']:.2f} с "
+          f"({report['throughput']:.1f} /с)")
+    print(f"Задержка p50 / p99:    {report['p50'] * 1000:.1f} / {report['p99'] * 1000:.1f} мс "
+          f"(max {report['max'] * 1000:.1f} мс)")
+    print(f"Доля fallback:         {report['fallback_rate'] * 100:.1f}%")
+    print(f"Блокировка event loop: {report['loop_blocked'] * 1000:.1f} мс суммарно, "
+          f"максимальный простой {report['loop_max_stall'] * 1000:.1f} мс")
+    print(f"Счётчики AI:           {report['ai_stats']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="одновременных пользователей")
+    parser.add_argument("--requests", type=int, default=500, help="всего запросов цитаты")
+    parser.add_argument("--latency", type=float, default=0.3, help="задержка бэкенда, с")
+    parser.add_argument("--jitter", type=float, default=0.2, help="случайная добавка к задержке, с")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="доля ошибок бэкенда")
+    parser.add_argument("--timeout", type=float, default=1.0, help="дедлайн AI-запроса, с")
+    parser.add_argument("--concurrency", type=int, default=4, help="одновременных AI-запросов")
+    parser.add_argument("--blocking", action="store_true", help="бэкенд блокирует event loop")
+    parser.add_argument("--pool", action="store_true", help="выдавать цитаты из QuotePool")
+    parser.add_argument("--pool-size", type=int, default=5, help="цитат на ключ пула")
+    parser.add_argument("--tick", type=float, default=0.01, help="период монитора event loop, с")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print_report(asyncio.run(run_benchmark(args)))
+
+
+if __name__ == "__main__":
+    main()
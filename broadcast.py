@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Утренняя рассылка мотивационных цитат
+Пользователи читаются из SQLite постранично по user_id, сообщения уходят через полосу BULK планировщика;
+прогресс сохраняется после каждой страницы, прерванная рассылка продолжается с того же места
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from db_pool import ConnectionManager
+from metrics import metrics
+from motivation_quotes import MotivationQuotesGenerator
+from outbound import BULK, OutboundScheduler
+from stats import utc_now
+
+logger = logging.getLogger(__name__)
+
+_MORNING_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "🔄 Новая цитата", "callback_data": "daily_motivation"}],
+        [{"text": "🆘 Нужна поддержка", "callback_data": "emergency_help"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+# Хвост JSON-тела sendMessage: клавиатура сериализуется один раз на процесс
+_BODY_TAIL = (
+    ', "parse_mode": "Markdown", "reply_markup": '
+    + json.dumps(_MORNING_KEYBOARD, ensure_ascii=False, separators=(",", ":")) + "}"
+).encode("utf-8")
+
+Recipient = Tuple[int, Dict]
+
+
+class MorningBroadcast:
+    """Ежедневная рассылка утренней мотивации всем пользователям.
+
+    Пользователи выбираются страницами по ``chunk_size`` (keyset по
+    users.user_id), для страницы сразу готовятся все тексты, сообщения
+    ставятся в полосу BULK ``OutboundScheduler`` - ответы на нажатия
+    обслуживаются раньше рассылки, лимиты Telegram соблюдает планировщик.
+    После каждой страницы последний user_id сохраняется в broadcast_runs:
+    после перезапуска рассылка того же дня продолжается со следующей
+    страницы (повторно может прийти только незавершённая страница). В памяти
+    одна страница, время ограничено окном ``window_hours``. Пользователи,
+    заблокировавшие бота (403), исключаются до следующего /start.
+    Фоновый запуск - раз в сутки в ``hour`` часов (UTC).
+    """
+
+    NAME = "morning"
+
+    def __init__(self, db: ConnectionManager, outbound: OutboundScheduler,
+                 generator: MotivationQuotesGenerator,
+                 hour: Optional[int] = None,
+                 chunk_size: Optional[int] = None,
+                 window_hours: Optional[float] = None):
+        self.db = db
+        self.outbound = outbound
+        self.generator = generator
+        self.hour = hour if hour is not None else int(os.getenv("BROADCAST_HOUR", "6"))
+        self.chunk_size = chunk_size or int(os.getenv("BROADCAST_CHUNK", "200"))
+        self.window_hours = window_hours or float(os.getenv("BROADCAST_WINDOW_HOURS", "3"))
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def create_schema(db):
+        """Таблицы прогресса рассылок и отписавшихся (внутри открытой транзакции)"""
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS broadcast_runs (
+                name TEXT NOT NULL,
+                day TEXT NOT NULL,
+                last_user_id INTEGER NOT NULL DEFAULT 0,
+                sent INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                blocked INTEGER NOT NULL DEFAULT 0,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP,
+                PRIMARY KEY (name, day)
+            ) WITHOUT ROWID
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS broadcast_optouts (
+                user_id INTEGER PRIMARY KEY,
+                reason TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    async def start(self):
+        """Запуск ежедневной рассылки в фоне"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_daily(), name="broadcast")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _window_start(self):
+        now = utc_now()
+        return now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+
+    async def _run_daily(self):
+        # Прерванная сегодняшняя рассылка продолжается сразу, если окно ещё открыто
+        now = utc_now()
+        window = self._window_start()
+        if window <= now < window + timedelta(hours=self.window_hours):
+            await self._run_logged()
+        while True:
+            window = self._window_start()
+            if window <= utc_now():
+                window += timedelta(days=1)
+            await asyncio.sleep((window - utc_now()).total_seconds())
+            await self._run_logged()
+
+    async def _run_logged(self):
+        try:
+            await self.run()
+        except Exception as e:
+            logger.error(f"Ошибка утренней рассылки: {e}")
+
+    async def run(self, day: Optional[str] = None) -> Dict:
+        """Разослать (или дослать) рассылку дня; возвращает отчёт"""
+        day = day or utc_now().date().isoformat()
+        started = time.monotonic()
+        deadline = started + self.window_hours * 3600
+        report = await self._load_checkpoint(day)
+        if report["finished"]:
+            logger.info(f"Утренняя рассылка за {day} уже завершена")
+            return report
+        if report["last_user_id"]:
+            logger.info(f"Утренняя рассылка за {day} продолжается после user_id {report['last_user_id']}")
+        remaining = await self._count_after(report["last_user_id"])
+        estimate = remaining / self.outbound.global_bucket.rate
+        if estimate > self.window_hours * 3600:
+            logger.warning(f"Утренняя рассылка: {remaining} получателей - около {estimate / 3600:.1f} ч "
+                           f"при TELEGRAM_GLOBAL_RATE, больше окна {self.window_hours:g} ч")
+
+        while True:
+            if time.monotonic() > deadline:
+                logger.error(f"Утренняя рассылка за {day} не уложилась в {self.window_hours:g} ч, "
+                             f"остановлена после user_id {report['last_user_id']}")
+                break
+            recipients = await self._next_chunk(report["last_user_id"])
+            if not recipients:
+                report["finished"] = True
+                await self._save_checkpoint(day, report, [])
+                break
+            outcomes = await asyncio.gather(*(
+                self._send(user_id, self.render(progress)) for user_id, progress in recipients
+            ))
+            blocked = [user_id for (user_id, _), outcome in zip(recipients, outcomes) if outcome == "blocked"]
+            for outcome in outcomes:
+                report[outcome] += 1
+                metrics.inc("broadcast_messages_total", outcome=outcome)
+            report["last_user_id"] = recipients[-1][0]
+            await self._save_checkpoint(day, report, blocked)
+
+        report["seconds"] = round(time.monotonic() - started, 3)
+        logger.info(
+            f"Утренняя рассылка за {day}: отправлено {report['sent']}, ошибок {report['failed']}, "
+            f"заблокировали бота {report['blocked']}, {report['seconds']} с"
+        )
+        return report
+
+    def render(self, progress: Dict) -> str:
+        """Текст утренней мотивации для одного пользователя"""
+        quote = self.generator.get_personalized_morning_quote(progress)
+        challenge = self.generator.get_daily_challenge_quote()
+        return f"""💫 **ДОБРОЕ УТРО!**
+
+{quote}
+
+---
+
+{challenge}"""
+
+    async def _send(self, user_id: int, text: str) -> str:
+        # В личном чате chat_id совпадает с user_id
+        head = json.dumps({"chat_id": user_id, "text": text}, ensure_ascii=False, separators=(",", ":"))
+        body = head[:-1].encode("utf-8") + _BODY_TAIL
+        response_data = await self.outbound.send("sendMessage", user_id, body=body, lane=BULK)
+        if response_data and response_data.get("ok"):
+            return "sent"
+        if response_data and response_data.get("error_code") == 403:
+            return "blocked"
+        return "failed"
+
+    async def _next_chunk(self, after_user_id: int) -> List[Recipient]:
+        async with self.db.reader() as db:
+            cursor = await db.execute("""
+                SELECT u.user_id, p.total_interventions, p.current_streak, p.last_intervention_date
+                FROM users AS u LEFT JOIN user_progress AS p ON p.user_id = u.user_id
+                WHERE u.user_id > ?
+                  AND NOT EXISTS (SELECT 1 FROM broadcast_optouts AS o WHERE o.user_id = u.user_id)
+                ORDER BY u.user_id
+                LIMIT ?
+            """, (after_user_id, self.chunk_size))
+            rows = await cursor.fetchall()
+        return [
+            (user_id, {"total_interventions": total or 0, "current_streak": streak or 0,
+                       "last_intervention_date": last_date})
+            for user_id, total, streak, last_date in rows
+        ]
+
+    async def _count_after(self, after_user_id: int) -> int:
+        async with self.db.reader() as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM users WHERE user_id > ?", (after_user_id,))
+            return (await cursor.fetchone())[0]
+
+    async def _load_checkpoint(self, day: str) -> Dict:
+        async with self.db.writer() as db:
+            await db.execute(
+                "INSERT OR IGNORE INTO broadcast_runs (name, day) VALUES (?, ?)", (self.NAME, day)
+            )
+            cursor = await db.execute(
+                "SELECT last_user_id, sent, failed, blocked, finished_at FROM broadcast_runs "
+                "WHERE name = ? AND day = ?",
+                (self.NAME, day)
+            )
+            last_user_id, sent, failed, blocked, finished_at = await cursor.fetchone()
+        return {"day": day, "last_user_id": last_user_id, "sent": sent, "failed": failed,
+                "blocked": blocked, "finished": finished_at is not None}
+
+    async def _save_checkpoint(self, day: str, report: Dict, blocked: List[int]):
+        async with self.db.writer() as db:
+            await db.execute("""
+                UPDATE broadcast_runs
+                SET last_user_id = :last_user_id, sent = :sent, failed = :failed, blocked = :blocked,
+                    finished_at = CASE WHEN :finished THEN CURRENT_TIMESTAMP END
+                WHERE name = :name AND day = :day
+            """, {**report, "name": self.NAME, "day": day})
+            if blocked:
+                await db.executemany(
+                    "INSERT OR IGNORE INTO broadcast_optouts (user_id, reason) VALUES (?, 'blocked')",
+                    [(user_id,) for user_id in blocked]
+                )
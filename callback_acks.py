@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Фоновые ответы на callback query
+answerCallbackQuery уходит параллельно с обработчиком, а не перед ним: нажатие не ждёт лишний запрос к Telegram
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Deque, Optional, Set, Tuple
+
+from metrics import metrics
+from telegram_api import TelegramAPIClient, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackAcknowledger:
+    """Очередь answerCallbackQuery с фоновой отправкой.
+
+    ``answer`` только ставит id в очередь и сразу возвращается. Фоновая
+    задача отправляет накопившиеся ответы параллельно по общему пулу
+    соединений: пачкой в пределах запаса ограничителя, дальше - не чаще
+    ``rate`` в секунду. Ошибки и таймауты логируются и не доходят до
+    обработчика; ответы старше ``max_age`` секунд не отправляются
+    (Telegram всё равно отклонит «старый» запрос).
+    """
+
+    def __init__(self, api: TelegramAPIClient,
+                 rate: Optional[float] = None,
+                 timeout: Optional[float] = None,
+                 max_age: float = 10.0):
+        self.api = api
+        self.limiter = TokenBucket(rate or float(os.getenv("CALLBACK_ACK_RATE", "100")))
+        self.timeout = timeout or float(os.getenv("CALLBACK_ACK_TIMEOUT", "5"))
+        self.max_age = max_age
+        self._queue: Deque[Tuple[str, float]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Ответы в очереди и в полёте"""
+        return len(self._queue) + len(self._in_flight)
+
+    def answer(self, callback_query_id: str):
+        """Поставить ответ в очередь (не ждёт сети)"""
+        self._queue.append((callback_query_id, time.monotonic()))
+        if self._task is None or self._task.done():
+            # Запуск при первом нажатии - в том event loop, где работает бот
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._send_periodically(), name="callback-acks")
+        self._wakeup.set()
+
+    async def _send_periodically(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            # Пока есть токены, acquire не уступает управление - накопленное уходит одной пачкой
+            await self.limiter.acquire()
+            self._send_next()
+
+    def _send_next(self) -> bool:
+        """Отправить первый неустаревший ответ из очереди"""
+        now = time.monotonic()
+        while self._queue:
+            callback_query_id, queued_at = self._queue.popleft()
+            if now - queued_at > self.max_age:
+                metrics.inc("callback_acks_dropped_total")
+                continue
+            task = asyncio.create_task(self._send(callback_query_id))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+            return True
+        return False
+
+    async def _send(self, callback_query_id: str):
+        try:
+            response = await self.api.post(
+                "answerCallbackQuery", {"callback_query_id": callback_query_id}, timeout=self.timeout
+            )
+            if response.status_code != 200:
+                logger.warning(f"answerCallbackQuery {callback_query_id}: HTTP {response.status_code}")
+        except Exception as e:
+            logger.warning(f"answerCallbackQuery {callback_query_id} не отправлен: {e!r}")
+
+    async def stop(self):
+        """Остановить фоновую задачу, отправив оставшиеся ответы"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._send_next():
+            pass
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
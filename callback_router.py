@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Маршрутизатор callback-запросов
+Точные совпадения - словарь, параметризованные callback'и - префиксное дерево (самый длинный префикс)
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RouteStats:
+    """Время обработки одного маршрута"""
+
+    __slots__ = ("count", "errors", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, elapsed: float, failed: bool = False):
+        self.count += 1
+        self.errors += failed
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+
+
+class _TrieNode:
+    __slots__ = ("children", "route")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.route: Optional[Tuple[str, Callable]] = None
+
+
+class CallbackRouter:
+    """Диспетчеризация callback_data без цепочки if/elif.
+
+    ``@router.exact("faq")`` - обработчик точного значения,
+    ``@router.prefix("technique_")`` - обработчик всех значений с префиксом;
+    из нескольких подходящих префиксов выигрывает самый длинный, поэтому
+    порядок регистрации не важен. Поиск - O(1) по словарю или O(длины
+    callback_data) по дереву (Telegram ограничивает её 64 байтами).
+    ``observer(route, elapsed, failed)`` вызывается после каждого обработчика.
+    """
+
+    def __init__(self, observer: Optional[Callable[[str, float, bool], None]] = None):
+        self._exact: Dict[str, Tuple[str, Callable]] = {}
+        self._root = _TrieNode()
+        self.stats: Dict[str, RouteStats] = {}
+        self.observer = observer
+
+    def exact(self, *values: str):
+        """Декоратор: обработчик для точных значений callback_data"""
+        def register(handler: Callable) -> Callable:
+            for value in values:
+                if value in self._exact:
+                    raise ValueError(f"Маршрут уже зарегистрирован: {value}")
+                self._exact[value] = (value, handler)
+                self.stats[value] = RouteStats()
+            return handler
+        return register
+
+    def prefix(self, value: str):
+        """Декоратор: обработчик для callback_data, начинающихся с value"""
+        def register(handler: Callable) -> Callable:
+            node = self._root
+            for char in value:
+                node = node.children.setdefault(char, _TrieNode())
+            if node.route is not None:
+                raise ValueError(f"Префикс уже зарегистрирован: {value}")
+            route = f"{value}*"
+            node.route = (route, handler)
+            self.stats[route] = RouteStats()
+            return handler
+        return register
+
+    def resolve(self, data: str) -> Optional[Tuple[str, Callable]]:
+        """(имя маршрута, обработчик) для callback_data или None"""
+        match = self._exact.get(data)
+        if match is not None:
+            return match
+        node, best = self._root, None
+        for char in data:
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.route is not None:
+                best = node.route
+        return best
+
+    async def dispatch(self, data: str, *args) -> bool:
+        """Вызвать обработчик для data с аргументами args; False - маршрут не найден"""
+        match = self.resolve(data)
+        if match is None:
+            logger.debug(f"Нет обработчика для callback_data='{data}'")
+            return False
+        route, handler = match
+        started = time.perf_counter()
+        failed = True
+        try:
+            await handler(*args)
+            failed = False
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats[route].record(elapsed, failed)
+            if self.observer is not None:
+                self.observer(route, elapsed, failed)
+        return True
+
+    def timings(self) -> Dict[str, Dict]:
+        """Снимок статистики по маршрутам, которые уже вызывались"""
+        return {route: stats.as_dict() for route, stats in self.stats.items() if stats.count}
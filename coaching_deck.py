@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Колода коучинговых вопросов без повторений
+Для каждого пользователя хранится перемешанная перестановка id вопросов и курсор
+"""
+
+import random
+import sys
+from array import array
+from typing import List
+
+from db_pool import ConnectionManager
+
+
+def _pack(order: List[int]) -> bytes:
+    packed = array("H", order)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(blob: bytes) -> array:
+    order = array("H")
+    order.frombytes(blob)
+    if sys.byteorder == "big":
+        order.byteswap()
+    return order
+
+
+class CoachingDeck:
+    """Перемешанная колода из ``size`` вопросов на пользователя.
+
+    Вытягивание вопроса - чтение строки по первичному ключу и
+    ``position = position + 1``; перестановка (2 байта на вопрос)
+    перезаписывается только при перемешивании, когда колода закончилась.
+    """
+
+    def __init__(self, db: ConnectionManager, size: int):
+        self.db = db
+        self.size = size
+        self._table_ready = False
+
+    async def _ensure_table(self, db):
+        if self._table_ready:
+            return
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS coaching_decks (
+                user_id INTEGER PRIMARY KEY,
+                deck BLOB NOT NULL,
+                position INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._table_ready = True
+
+    def _shuffle(self, last_drawn: int = -1) -> List[int]:
+        order = list(range(self.size))
+        random.shuffle(order)
+        # Не начинаем новую колоду с вопроса, которым закончилась предыдущая
+        if self.size > 1 and order[0] == last_drawn:
+            order[0], order[-1] = order[-1], order[0]
+        return order
+
+    async def draw(self, user_id: int) -> int:
+        """Следующий id вопроса для пользователя; колода перемешивается по исчерпании"""
+        async with self.db.writer() as db:
+            await self._ensure_table(db)
+            cursor = await db.execute(
+                "SELECT deck, position FROM coaching_decks WHERE user_id = ?",
+                (user_id,)
+            )
+            row = await cursor.fetchone()
+
+            if row is not None:
+                order = _unpack(row[0])
+                position = row[1]
+                if len(order) == self.size and position < self.size:
+                    await db.execute(
+                        "UPDATE coaching_decks SET position = position + 1 WHERE user_id = ?",
+                        (user_id,)
+                    )
+                    return order[position]
+                last_drawn = order[-1] if order else -1
+            else:
+                last_drawn = -1
+
+            order = self._shuffle(last_drawn)
+            await db.execute(
+                """INSERT OR REPLACE INTO coaching_decks (user_id, deck, position, updated_at)
+                   VALUES (?, ?, 1, CURRENT_TIMESTAMP)""",
+                (user_id, _pack(order))
+            )
+            return order[0]
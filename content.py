@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Реестр статического контента бота
+Дыхательные техники, медитации, коучинговые вопросы, мини-игры и техники по типам импульсов.
+Загружается один раз при импорте; записи неизменяемые, id записи = её индекс в коллекции.
+"""
+
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+
+def _freeze(items: List[Dict]) -> Tuple[Mapping, ...]:
+    """Неизменяемые записи со стабильным целочисленным id (индекс в коллекции)"""
+    return tuple(
+        MappingProxyType({"id": index, **item})
+        for index, item in enumerate(items)
+    )
+
+
+_BREATHING_EXERCISES = [
+    # Классические техники (1-5)
+    {"name": "4-7-8 дыхание", "instruction": """🫁 **Техника 4-7-8**\n\n1️⃣ Вдохните через нос на 4 счета\n2️⃣ Задержите дыхание на 7 счетов\n3️⃣ Выдохните через рот на 8 счетов\n4️⃣ Повторите 3-4 раза\n\nЭта техника помогает активировать парасимпатическую нервную систему и снизить стресс."""},
+    {"name": "Квадратное дыхание", "instruction": """🟦 **Квадратное дыхание**\n\n1️⃣ Вдох на 4 счета\n2️⃣ Задержка на 4 счета\n3️⃣ Выдох на 4 счета\n4️⃣ Задержка на 4 счета\n🔄 Повторите 5-6 раз\n\nПредставьте, что рисуете квадрат дыханием."""},
+    {"name": "Треугольное дыхание", "instruction": """🔺 **Треугольное дыхание**\n\n1️⃣ Вдох на 3 счета\n2️⃣ Задержка на 3 счета\n3️⃣ Выдох на 3 счета\n🔄 Повторите 7-8 раз\n\nПростая техника для быстрого успокоения."""},
+    {"name": "Дыхание 5-5", "instruction": """⚖️ **Равномерное дыхание 5-5**\n\n1️⃣ Вдох на 5 счетов\n2️⃣ Выдох на 5 счетов\n🔄 Продолжайте 3-5 минут\n\nСинхронизирует работу сердца и легких."""},
+    {"name": "Брюшное дыхание", "instruction": """🤱 **Диафрагмальное дыхание**\n\n1️⃣ Положите руку на живот\n2️⃣ Вдыхайте так, чтобы поднимался живот, не грудь\n3️⃣ Выдыхайте медленно через слегка сжатые губы\n🔄 Повторите 5-10 раз"""},
+
+    # Успокаивающие техники (6-10)
+    {"name": "Дыхание океана", "instruction": """🌊 **Удджайи (дыхание океана)**\n\n1️⃣ Дышите через нос\n2️⃣ Слегка сожмите горло, создавая тихий звук 'хх'\n3️⃣ Вдох и выдох должны быть одинаковой длины\n🔄 Продолжайте 2-3 минуты\n\nЗвук напоминает шум океана."""},
+    {"name": "Дыхание пчелы", "instruction": """🐝 **Бхрамари (дыхание пчелы)**\n\n1️⃣ Закройте уши большими пальцами\n2️⃣ Вдохните носом\n3️⃣ На выдохе создайте звук 'ммм'\n🔄 Повторите 5-7 раз\n\nВибрация успокаивает нервную систему."""},
+    {"name": "Лунное дыхание", "instruction": """🌙 **Чандра Бхедана (лунное дыхание)**\n\n1️⃣ Закройте правую ноздрю пальцем\n2️⃣ Дышите только левой ноздрей\n3️⃣ Вдох и выдох медленные\n🔄 Продолжайте 2-3 минуты\n\nОхлаждает и успокаивает."""},
+    {"name": "Дыхание в счет 6", "instruction": """6️⃣ **Шестисчетное дыхание**\n\n1️⃣ Вдох на 6 счетов\n2️⃣ Задержка на 6 счетов\n3️⃣ Выдох на 6 счетов\n🔄 Повторите 6 циклов\n\nГармонизирует энергию."""},
+    {"name": "Сердечное дыхание", "instruction": """❤️ **Дыхание сердцем**\n\n1️⃣ Положите руку на сердце\n2️⃣ Дышите в ритме сердцебиения\n3️⃣ Представьте, как дыхание входит и выходит через сердце\n🔄 Продолжайте 3-5 минут"""},
+
+    # Энергизирующие техники (11-15)
+    {"name": "Огненное дыхание", "instruction": """🔥 **Капалабхати (огненное дыхание)**\n\n1️⃣ Быстрые короткие выдохи через нос\n2️⃣ Вдохи происходят автоматически\n3️⃣ Активно работают мышцы живота\n🔄 30 быстрых выдохов, затем отдых\n\n⚠️ Не делайте при головокружении."""},
+    {"name": "Солнечное дыхание", "instruction": """☀️ **Сурья Бхедана (солнечное дыхание)**\n\n1️⃣ Закройте левую ноздрю\n2️⃣ Дышите только правой ноздрей\n3️⃣ Активные, бодрящие вдохи-выдохи\n🔄 Продолжайте 1-2 минуты\n\nПовышает энергию и концентрацию."""},
+    {"name": "Дыхание силы", "instruction": """💪 **Мощное дыхание**\n\n1️⃣ Резкий глубокий вдох через нос\n2️⃣ Задержка на 3 счета\n3️⃣ Мощный выдох через рот со звуком 'ХА!'\n🔄 Повторите 5 раз\n\nВысвобождает заблокированную энергию."""},
+    {"name": "Ступенчатое дыхание", "instruction": """🪜 **Дыхание по ступеням**\n\n1️⃣ Вдыхайте порциями: 2 счета, пауза, еще 2 счета, пауза, еще 2\n2️⃣ Полный выдох одним потоком\n3️⃣ Повторите с выдохом по ступеням, вдохом одним потоком\n🔄 5-7 циклов каждого варианта"""},
+    {"name": "Дыхание воина", "instruction": """⚔️ **Дыхание воина**\n\n1️⃣ Вдох - поднимите руки вверх\n2️⃣ Задержка - сожмите кулаки\n3️⃣ Выдох - резко опустите руки вниз\n🔄 Повторите 7 раз\n\nСочетает дыхание с движением."""},
+
+    # Специальные техники (16-20)
+    {"name": "Альтернативное дыхание", "instruction": """🔄 **Нади Шодхана (альтернативное дыхание)**\n\n1️⃣ Закройте правую ноздрю, вдохните левой\n2️⃣ Закройте левую, откройте правую, выдохните\n3️⃣ Вдохните правой\n4️⃣ Закройте правую, откройте левую, выдохните\n🔄 10 полных циклов\n\nБалансирует левое и правое полушария."""},
+    {"name": "Дыхание льва", "instruction": """🦁 **Симхасана (дыхание льва)**\n\n1️⃣ Глубокий вдох через нос\n2️⃣ Широко откройте рот, высуньте язык\n3️⃣ Мощный выдох со звуком 'АААА'\n4️⃣ Смотрите вверх или в межбровье\n🔄 Повторите 3-5 раз\n\nСнимает напряжение лица и горла."""},
+    {"name": "Дыхание волны", "instruction": """🌊 **Волновое дыхание**\n\n1️⃣ Представьте волну, поднимающуюся от живота к груди на вдохе\n2️⃣ На выдохе волна опускается от груди к животу\n3️⃣ Дыхание плавное, непрерывное\n🔄 Продолжайте 5-10 волн\n\nСоздает ощущение текучести."""},
+    {"name": "Дыхание в цвете", "instruction": """🎨 **Цветное дыхание**\n\n1️⃣ Выберите успокаивающий цвет (голубой, зеленый)\n2️⃣ На вдохе представьте, что вдыхаете этот цвет\n3️⃣ На выдохе выдыхайте темный цвет (серый, черный)\n🔄 10-15 вдохов\n\nВизуализация усиливает эффект."""},
+    {"name": "Дыхание со звуком", "instruction": """🎵 **Дыхание с мантрой**\n\n1️⃣ На вдохе мысленно произносите 'СО'\n2️⃣ На выдохе мысленно произносите 'ХАМ'\n3️⃣ Дыхание естественное, не форсированное\n🔄 Продолжайте 5-10 минут\n\n'Со Хам' означает 'Я есть то'."""},
+
+    # Продвинутые техники (21-25)
+    {"name": "Ретенционное дыхание", "instruction": """⏱️ **Дыхание с задержками**\n\n1️⃣ Вдох на 4 счета\n2️⃣ Задержка на полном вдохе - 16 счетов\n3️⃣ Выдох через рот на 8 счетов\n🔄 Начните с меньших пропорций 4-8-4\n\n⚠️ Не принуждайте себя."""},
+    {"name": "Дыхание шипения", "instruction": """🐍 **Ситали (охлаждающее дыхание)**\n\n1️⃣ Сверните язык трубочкой\n2️⃣ Вдыхайте через свернутый язык со звуком 'ссс'\n3️⃣ Выдыхайте через нос\n🔄 10-15 вдохов\n\nОхлаждает тело и ум."""},
+    {"name": "Дыхание свистка", "instruction": """💨 **Ситкари (свистящее дыхание)**\n\n1️⃣ Слегка разожмите губы\n2️⃣ Прижмите язык к зубам\n3️⃣ Вдыхайте со свистящим звуком\n4️⃣ Выдыхайте через нос\n🔄 10-12 вдохов\n\nТакже охлаждает."""},
+    {"name": "Пранаяма 1-4-2", "instruction": """📐 **Классическая пропорция 1:4:2**\n\n1️⃣ Если вдох на 4 счета\n2️⃣ То задержка на 16 счетов\n3️⃣ А выдох на 8 счетов\n🔄 Начните с пропорции 1:2:1\n\nПостепенно увеличивайте время."""},
+    {"name": "Дыхание освобождения", "instruction": """🕊️ **Освобождающее дыхание**\n\n1️⃣ Глубокий вдох с поднятием рук\n2️⃣ Задержка - представьте, что держите все проблемы\n3️⃣ Резкий выдох - 'отпускаете' все через руки\n4️⃣ Руки свободно падают\n🔄 Повторите 5-7 раз\n\nФизически отпускаете напряжение."""}
+]
+
+_MEDITATION_PRACTICES = [
+    # Базовые медитации (1-10)
+    {"name": "Медитация дыхания", "instruction": """🫁 **Анапанасати (медитация на дыхании)**\n\n1️⃣ Сядьте удобно, закройте глаза\n2️⃣ Наблюдайте за естественным дыханием\n3️⃣ Когда ум отвлекается, мягко возвращайте внимание к дыханию\n🔄 Практикуйте 5-10 минут\n\nОснова всех медитативных практик."""},
+    {"name": "Сканирование тела", "instruction": """🧘‍♀️ **Бодисканинг**\n\n1️⃣ Лягте или сядьте удобно\n2️⃣ Начните с пальцев ног, медленно поднимайтесь вверх\n3️⃣ Замечайте ощущения в каждой части тела\n4️⃣ Не пытайтесь изменить - просто наблюдайте\n🔄 15-20 минут полного сканирования"""},
+    {"name": "Медитация ходьбы", "instruction": """🚶‍♀️ **Кинхин (медитация ходьбы)**\n\n1️⃣ Идите очень медленно (медленнее обычного в 3-4 раза)\n2️⃣ Сосредоточьтесь на ощущениях в стопах\n3️⃣ Чувствуйте каждый шаг: подъем, движение, опускание\n🔄 10-15 минут медленной ходьбы"""},
+    {"name": "Медитация звуков", "instruction": """🎵 **Шротра дхарана (медитация звуков)**\n\n1️⃣ Закройте глаза, расслабьтесь\n2️⃣ Слушайте все звуки вокруг без оценки\n3️⃣ Не фокусируйтесь на одном звуке - принимайте все\n4️⃣ Когда ум начинает анализировать, возвращайтесь к слушанию\n🔄 10-15 минут"""},
+    {"name": "Медитация на пламя", "instruction": """🕯️ **Тратака (медитация на свечу)**\n\n1️⃣ Зажгите свечу, сядьте на расстоянии 1-2 метра\n2️⃣ Смотрите на пламя, не моргая как можно дольше\n3️⃣ Когда глаза устанут, закройте их и видьте отпечаток пламени\n4️⃣ Повторите цикл\n🔄 15-20 минут практики"""},
+
+    # Практики осознанности (11-20)
+    {"name": "Осознанное питание", "instruction": """🍎 **Медитативное питание**\n\n1️⃣ Возьмите небольшой кусочек еды (изюм, орех)\n2️⃣ Рассмотрите его 1-2 минуты\n3️⃣ Медленно жуйте, замечая все ощущения\n4️⃣ Почувствуйте текстуру, вкус, как глотаете\n🔄 Превратите каждый прием пищи в медитацию"""},
+    {"name": "Осознанное мытье посуды", "instruction": """🍽️ **Медитация в действии**\n\n1️⃣ Мойте посуду очень медленно и внимательно\n2️⃣ Чувствуйте температуру воды, текстуру мыла\n3️⃣ Наблюдайте за движениями рук\n4️⃣ Когда ум отвлекается, возвращайтесь к ощущениям\n🔄 Превратите рутину в практику"""},
+    {"name": "Медитация эмоций", "instruction": """😌 **Наблюдение за эмоциями**\n\n1️⃣ Сядьте удобно, закройте глаза\n2️⃣ Вспомните легкую неприятную ситуацию\n3️⃣ Наблюдайте, где в теле чувствуете эмоцию\n4️⃣ Дышите в это место, не пытаясь изменить\n🔄 5-10 минут наблюдения"""},
+    {"name": "Медитация мыслей", "instruction": """💭 **Випассана (наблюдение мыслей)**\n\n1️⃣ Сядьте в медитации, наблюдайте дыхание\n2️⃣ Когда приходит мысль, мысленно скажите 'мысль'\n3️⃣ Не развивайте мысль, не оценивайте - просто отметьте\n4️⃣ Вернитесь к дыханию\n🔄 15-20 минут практики"""},
+    {"name": "Медитация благодарности", "instruction": """🙏 **Практика благодарности**\n\n1️⃣ Положите руку на сердце\n2️⃣ Вспомните 3 вещи, за которые благодарны\n3️⃣ Почувствуйте тепло благодарности в груди\n4️⃣ Пошлите это чувство всем, кто вам помог\n🔄 5-10 минут каждое утро"""},
+
+    # Визуализации (21-30)
+    {"name": "Медитация света", "instruction": """💡 **Джьоти медитация**\n\n1️⃣ Представьте золотой свет в области сердца\n2️⃣ С каждым вдохом свет становится ярче\n3️⃣ С выдохом свет распространяется по телу\n4️⃣ В конце пошлите свет всем существам\n🔄 10-15 минут визуализации"""},
+    {"name": "Медитация горы", "instruction": """⛰️ **Практика устойчивости**\n\n1️⃣ Представьте себя величественной горой\n2️⃣ Основание глубоко в земле, вершина в облаках\n3️⃣ Наблюдайте, как вокруг меняется погода, но вы неподвижны\n4️⃣ Чувствуйте внутреннюю устойчивость и силу\n🔄 10-20 минут"""},
+    {"name": "Медитация океана", "instruction": """🌊 **Практика спокойствия**\n\n1️⃣ Представьте себя глубоким океаном\n2️⃣ На поверхности могут быть волны (мысли, эмоции)\n3️⃣ Но в глубине всегда покой и тишина\n4️⃣ Опускайтесь в эти глубины сознания\n🔄 15-25 минут"""},
+    {"name": "Медитация дерева", "instruction": """🌳 **Практика роста**\n\n1️⃣ Представьте себя деревом\n2️⃣ Корни глубоко в земле - ваша устойчивость\n3️⃣ Ствол - ваша сила и целостность\n4️⃣ Ветви тянутся к свету - ваше развитие\n🔄 10-15 минут"""},
+    {"name": "Медитация цветка лотоса", "instruction": """🪷 **Падма медитация**\n\n1️⃣ Представьте лотос в области сердца\n2️⃣ С каждым вдохом лепестки медленно раскрываются\n3️⃣ В центре цветка - чистый свет сознания\n4️⃣ Почувствуйте, как раскрывается ваше сердце\n🔄 15-20 минут"""},
+
+    # Мантра-медитации (31-40)
+    {"name": "Мантра ОМ", "instruction": """🕉️ **Пранава мантра**\n\n1️⃣ Сядьте удобно, закройте глаза\n2️⃣ На выдохе произносите 'ОММММММммм'\n3️⃣ Чувствуйте вибрацию в груди и голове\n4️⃣ На вдохе тишина\n🔄 21 повтор или 10-15 минут"""},
+    {"name": "Мантра Со Хам", "instruction": """🎵 **'Я есть то'**\n\n1️⃣ На вдохе мысленно 'СО'\n2️⃣ На выдохе мысленно 'ХАМ'\n3️⃣ Не контролируйте дыхание, следуйте за ним\n4️⃣ Ощутите единство с дыханием жизни\n🔄 15-30 минут"""},
+    {"name": "Мантра покоя", "instruction": """☮️ **Шанти мантра**\n\n1️⃣ Повторяйте: 'ОМ ШАНТИ ШАНТИ ШАНТИ'\n2️⃣ Первое шанти - мир в теле\n3️⃣ Второе - мир в уме\n4️⃣ Третье - мир в окружающем мире\n🔄 108 повторов или 20 минут"""},
+    {"name": "Мантра сострадания", "instruction": """💖 **Авалокитешвара мантра**\n\n1️⃣ Повторяйте: 'ОМ МАНИ ПАДМЕ ХУМ'\n2️⃣ Представляйте, как сострадание наполняет сердце\n3️⃣ Пошлите любовь всем существам\n4️⃣ Начните с близких, расширьте на всех\n🔄 108 повторов"""},
+    {"name": "Мантра мудрости", "instruction": """🧠 **Гаятри мантра (упрощенная)**\n\n1️⃣ Повторяйте: 'ОМ НАМО ГУРУ ДЭВАЙЯ'\n2️⃣ 'Поклон учителю света внутри'\n3️⃣ Обращайтесь к высшей мудрости в себе\n4️⃣ Просите о ясности и понимании\n🔄 108 повторов"""},
+
+    # Продвинутые практики (41-50)
+    {"name": "Медитация пустоты", "instruction": """🕳️ **Шуньята медитация**\n\n1️⃣ Наблюдайте пространство между мыслями\n2️⃣ Замечайте паузы между вдохом и выдохом\n3️⃣ Погружайтесь в эту естественную пустоту\n4️⃣ Не пытайтесь создать пустоту - найдите ее\n🔄 20-30 минут"""},
+    {"name": "Медитация свидетеля", "instruction": """👁️ **Сакши бхава**\n\n1️⃣ Наблюдайте за всем, что происходит в уме\n2️⃣ Мысли, эмоции, ощущения - как облака в небе\n3️⃣ Вы - неизменное небо, не облака\n4️⃣ Просто свидетельствуйте без участия\n🔄 25-40 минут"""},
+    {"name": "Медитация 'Кто я?'", "instruction": """❓ **Атма вичара**\n\n1️⃣ Задавайте вопрос: 'Кто я?'\n2️⃣ Не ищите ответ умом\n3️⃣ Погружайтесь в чувство 'Я есть'\n4️⃣ Отбрасывайте все определения себя\n🔄 20-45 минут самоисследования"""},
+    {"name": "Медитация единства", "instruction": """🌍 **Адвайта медитация**\n\n1️⃣ Начните чувствовать связь с окружающим\n2️⃣ Растворите границы между 'я' и 'не-я'\n3️⃣ Ощутите единое сознание во всем\n4️⃣ Нет медитирующего и медитации - есть только медитация\n🔄 30-60 минут"""},
+    {"name": "Медитация тишины", "instruction": """🤫 **Маунам**\n\n1️⃣ Не используйте техники\n2️⃣ Просто сидите в полной тишине\n3️⃣ Не следуйте за мыслями, не отвергайте их\n4️⃣ Будьте тишиной, которая всегда присутствует\n🔄 От 20 минут до нескольких часов"""}
+]
+
+_COACHING_QUESTIONS = [
+    # Вопросы о будущем (1-20)
+    "🤔 Что я почувствую через 10 минут, если НЕ поддамся этому импульсу?",
+    "🌟 Что я буду чувствовать завтра утром, если справлюсь с этим импульсом?",
+    "⏰ Как я буду относиться к этому моменту через час?",
+    "📅 Будет ли мне стыдно за это завтра?",
+    "🎯 Приближает ли этот выбор меня к моей мечте?",
+    "🔮 Каким человеком я стану, если продолжу сопротивляться?",
+    "🌅 Что изменится в моей жизни, если я устою сегодня?",
+    "📈 Как этот выбор повлияет на мой прогресс через неделю?",
+    "🏆 Каким будет мой следующий уровень, если я не сдамся?",
+    "✨ О чем я буду мечтать, если справлюсь с этим?",
+    "🌱 Какие возможности откроются, если я устою?",
+    "💫 Какую версию себя я хочу увидеть через месяц?",
+    "🚀 К какой цели это меня приблизит?",
+    "⭐ Что произойдет, если я стану сильнее этого импульса?",
+    "🎪 Какой праздник я себе устрою, если справлюсь?",
+    "🌈 Какое действие приблизит меня к тому человеку, которым я хочу стать?",
+    "🎁 Какой подарок будущему себе я делаю прямо сейчас?",
+    "🔥 Насколько горжусь собой буду через год?",
+    "💎 Какой драгоценный опыт я получу, если устою?",
+    "🎯 Как этот выбор соотносится с моими долгосрочными целями?",
+
+    # Альтернативы и замещения (21-40)
+    "💭 Какую альтернативу я могу выбрать прямо сейчас?",
+    "🎁 Какой подарок я могу сделать себе вместо этого?",
+    "🌿 Что полезного я могу сделать в эту минуту?",
+    "📚 Чему новому я могу научиться вместо этого?",
+    "🏃‍♂️ Какое движение поможет мне переключиться?",
+    "🎨 Во что творческое я могу вложить эту энергию?",
+    "📞 С кем я могу поговорить вместо этого?",
+    "🎵 Какая музыка поможет мне изменить настрой?",
+    "📝 Что важного я могу записать или спланировать?",
+    "🌺 Что красивое я могу создать или увидеть?",
+    "💧 Что освежающее я могу выпить или съесть?",
+    "🧘‍♀️ Какое упражнение поможет мне расслабиться?",
+    "📖 Что вдохновляющее я могу прочитать?",
+    "🚶‍♀️ Куда я могу пойти, чтобы изменить обстановку?",
+    "🧹 Что я могу привести в порядок вокруг себя?",
+    "💌 Кому я могу написать приятное сообщение?",
+    "🎯 На какой позитивной цели я могу сосредоточиться?",
+    "🌱 Что я могу сделать для своего здоровья?",
+    "💡 Какую идею я могу развить вместо этого?",
+    "⏰ Могу ли я отложить это решение на 15 минут?",
+
+    # Самоанализ и понимание (41-60)
+    "🔍 Что на самом деле происходит со мной сейчас? Усталость? Стресс? Скука?",
+    "🧘‍♀️ Что мое тело на самом деле пытается мне сказать?",
+    "😌 Что бы я посоветовал близкому другу в такой ситуации?",
+    "💭 Какие мысли привели меня к этому моменту?",
+    "🎭 Какая эмоция скрывается за этим желанием?",
+    "🌊 Что я на самом деле пытаюсь заглушить или избежать?",
+    "🔥 От чего я пытаюсь убежать с помощью этой привычки?",
+    "🎪 Какую потребность я пытаюсь удовлетворить таким образом?",
+    "🌙 Что мне не хватает в жизни прямо сейчас?",
+    "💝 Чего я на самом деле жажду?",
+    "🗝️ Какой урок скрыт в этом моменте искушения?",
+    "🎨 Какие чувства я пытаюсь изменить?",
+    "🌱 Что этот импульс говорит о моих потребностях?",
+    "🔮 Какую пустоту я пытаюсь заполнить?",
+    "🎭 Какую роль играет эта привычка в моей жизни?",
+    "🌊 Как долго длится это желание обычно?",
+    "💡 Что запустило этот импульс сегодня?",
+    "🎯 Каких ресурсов мне не хватает сейчас?",
+    "🌿 Что мой организм действительно просит?",
+    "🎪 Какой сигнал подает мне мое подсознание?",
+
+    # Прошлый опыт и мотивация (61-80)
+    "🏆 Когда я в последний раз гордился собой за то, что устоял?",
+    "💪 Какая моя сильная сторона поможет мне сейчас устоять?",
+    "🌟 Какой мой самый яркий момент победы над собой?",
+    "🎯 Что помогло мне справиться в прошлый раз?",
+    "❤️ Кто в меня верит и поддерживает?",
+    "🔥 Какое мое самое важное 'почему'?",
+    "🌈 За что я больше всего благодарен в жизни?",
+    "💎 Какие мои главные ценности?",
+    "🌟 Какие качества во мне восхищают других?",
+    "🎪 Какой мой самый большой источник гордости?",
+    "🌱 Какой прогресс я уже сделал?",
+    "🏆 Какую победу над собой я помню лучше всего?",
+    "💖 Кого я люблю настолько, чтобы стать лучше?",
+    "🎯 Ради чего я готов меняться?",
+    "✨ Какая моя суперсила в трудные моменты?",
+    "🌊 Как я справлялся с этим раньше?",
+    "🔥 Что дает мне силы продолжать?",
+    "💪 В какие свои способности я точно верю?",
+    "🎨 Что делает меня уникальным?",
+    "🌟 Какой комплимент я себе больше всего заслуживаю?",
+
+    # Долгосрочная перспектива и ценности (81-100)
+    "❤️ Что важнее для меня в долгосрочной перспективе?",
+    "🚀 Как я могу превратить этот момент в победу?",
+    "🎯 Какие мои самые важные жизненные приоритеты?",
+    "💖 Какую любовь к себе я могу проявить сейчас?",
+    "🌱 Как этот выбор повлияет на мою самооценку?",
+    "🎪 Какую историю о себе я хочу рассказывать?",
+    "✨ Какой пример я подаю окружающим?",
+    "🌊 Что значит для меня быть сильным человеком?",
+    "💎 Какие принципы определяют мою личность?",
+    "🔥 За что я хочу, чтобы меня помнили?",
+    "🎨 Какой след я хочу оставить в мире?",
+    "🌟 Что делает мою жизнь значимой?",
+    "💫 Какой я хочу видеть свою историю?",
+    "🎯 Какой вклад я хочу внести в жизни близких?",
+    "🌈 Какой смысл я вкладываю в свои поступки?",
+    "🏆 Какое наследие я хочу оставить?",
+    "💪 Что означает для меня честность перед собой?",
+    "🌱 Какие мои действия отражают мои истинные ценности?",
+    "✨ Как я хочу чувствовать себя в конце дня?",
+    "🎁 Какую версию себя я выбираю прямо сейчас?"
+]
+
+_MINI_GAMES = {
+    # Математические игры (1-10)
+    "math": [
+        {"name": "Счет наоборот", "task": """🔢 **Обратный счет с правилами**\n\nСчитайте от 100 до 1, но:\n▪️ Пропускайте числа с цифрой 7\n▪️ Вместо чисел, кратных 5, говорите 'БУМ'\n▪️ При ошибке начинайте сначала\n\nПример: 100, 99, 98, 96, БУМ, 94..."""},
+        {"name": "Таблица умножения", "task": """✖️ **Быстрые вычисления**\n\n1️⃣ Выберите число от 6 до 9\n2️⃣ Умножайте его на числа от 1 до 20\n3️⃣ Говорите ответы вслух как можно быстрее\n4️⃣ Засеките время - старайтесь улучшить результат"""},
+        {"name": "Числовые последовательности", "task": """🔢 **Найди закономерность**\n\nПродолжите последовательности:\n• 2, 4, 8, 16, ?\n• 1, 4, 9, 16, 25, ?\n• 3, 6, 12, 24, ?\n• 1, 1, 2, 3, 5, 8, ?\n\nПридумайте свою последовательность!"""},
+        {"name": "Математические загадки", "task": """🧮 **Задачки в уме**\n\n• У меня есть 64 рубля в монетах по 1, 5 и 10 рублей. Монет по 5 рублей в два раза больше, чем по 10. Сколько монет каждого вида?\n• Решите без калькулятора: 17 × 23 = ?"""},
+        {"name": "Цифровые корни", "task": """🌱 **Игра с цифрами**\n\n1️⃣ Возьмите любое 3-значное число\n2️⃣ Сложите все его цифры\n3️⃣ Если получилось 2-значное число, снова сложите цифры\n4️⃣ Повторяйте, пока не получится 1 цифра\n\nПопробуйте с числами: 789, 456, 999"""}
+    ],
+    # Словесные игры (11-20)
+    "words": [
+        {"name": "Алфавитные категории", "task": """🔤 **Слова по алфавиту**\n\n1️⃣ Выберите категорию (города, животные, еда)\n2️⃣ Назовите слова на каждую букву алфавита\n3️⃣ Не повторяйтесь!\n4️⃣ Дошли до Я? Попробуйте в обратном порядке!"""},
+        {"name": "Рифмы и созвучия", "task": """🎵 **Поэтическая игра**\n\n1️⃣ Возьмите слово 'солнце'\n2️⃣ Найдите 10 слов, которые с ним рифмуются\n3️⃣ Составьте из них короткое стихотворение\n4️⃣ Попробуйте со словами: море, дом, мечта"""},
+        {"name": "Антонимы и синонимы", "task": """↔️ **Противоположности и сходства**\n\n1️⃣ К слову 'быстрый' найдите 5 синонимов и 5 антонимов\n2️⃣ Попробуйте со словами: умный, красивый, большой\n3️⃣ Составьте цепочки: быстрый → резвый → проворный..."""},
+        {"name": "Ассоциативные цепочки", "task": """🔗 **Игра ассоциаций**\n\n1️⃣ Начните со слова 'море'\n2️⃣ Каждое следующее слово - ассоциация к предыдущему\n3️⃣ Постройте цепочку из 20 слов\n4️⃣ Попробуйте вернуться к исходному слову"""},
+        {"name": "Палиндромы", "task": """🔄 **Слова-перевертыши**\n\nНайдите слова, которые читаются одинаково в обе стороны:\n• 3-буквенные: дед, шалаш, ...\n• 5-буквенные: казак, топот, ...\n• Составьте предложение из палиндромов!"""}
+    ],
+    # Визуальные игры (21-30)
+    "visual": [
+        {"name": "Цветовая радуга", "task": """🌈 **Цветная медитация**\n\n1️⃣ Закройте глаза\n2️⃣ Представьте красный цвет - где его видите?\n3️⃣ Переходите: оранжевый → желтый → зеленый → голубой → синий → фиолетовый\n4️⃣ Для каждого цвета - 3 предмета"""},
+        {"name": "Мысленная комната", "task": """🏠 **Архитектор воображения**\n\n1️⃣ Представьте идеальную комнату\n2️⃣ Мысленно расставьте мебель\n3️⃣ Выберите цвета стен, пола, потолка\n4️⃣ Добавьте детали: картины, растения, освещение\n5️⃣ 'Прогуляйтесь' по комнате"""},
+        {"name": "Геометрические фигуры", "task": """📐 **3D-визуализация**\n\n1️⃣ Представьте куб\n2️⃣ Поверните его в уме на 90°\n3️⃣ Превратите в пирамиду\n4️⃣ Затем в сферу\n5️⃣ Попробуйте сложные фигуры: тетраэдр, додекаэдр"""},
+        {"name": "Путешествие в воображении", "task": """✈️ **Мысленное путешествие**\n\n1️⃣ Выберите страну\n2️⃣ Представьте поездку туда во всех деталях\n3️⃣ Что видите в окне самолета?\n4️⃣ Какая погода? Люди? Еда?\n5️⃣ Спланируйте маршрут на неделю"""},
+        {"name": "Лица и эмоции", "task": """😊 **Галерея эмоций**\n\n1️⃣ Представьте лицо близкого человека\n2️⃣ 'Нарисуйте' на нем разные эмоции:\n• Радость, грусть, удивление\n• Гнев, страх, отвращение\n3️⃣ Какие мышцы лица меняются?"""}
+    ],
+    # Физические упражнения (31-40)
+    "physical": [
+        {"name": "Пальчиковая гимнастика", "task": """🤏 **Тренировка пальцев**\n\n1️⃣ Сожмите кулаки, разожмите (10 раз)\n2️⃣ Поочередно касайтесь большим пальцем всех остальных\n3️⃣ 'Играйте на пианино' в воздухе\n4️⃣ Сделайте 'замок' и потяните руки"""},
+        {"name": "Дыхательная гимнастика", "task": """🫁 **Активное дыхание**\n\n1️⃣ 4 быстрых вдоха через нос\n2️⃣ 1 длинный выдох через рот\n3️⃣ Повторите 10 раз\n4️⃣ Затем 1 глубокий вдох и долгий выдох со звуком 'Аааа'"""},
+        {"name": "Точечный массаж", "task": """👆 **Акупрессура**\n\n1️⃣ Помассируйте мочки ушей 30 секунд\n2️⃣ Точка между бровями - 30 секунд\n3️⃣ Точка в центре ладоней - по 30 секунд\n4️⃣ Помассируйте основание черепа"""},
+        {"name": "Растяжка сидя", "task": """🧘‍♀️ **Мини-йога**\n\n1️⃣ Потяните руки вверх, затем в стороны\n2️⃣ Поверните корпус влево, вправо\n3️⃣ Наклоните голову к плечам\n4️⃣ Сделайте круги плечами\n5️⃣ Потяните спину, прогнувшись назад"""},
+        {"name": "Упражнения для глаз", "task": """👀 **Гимнастика для глаз**\n\n1️⃣ Посмотрите вверх-вниз 10 раз\n2️⃣ Влево-вправо 10 раз\n3️⃣ По диагонали в обе стороны\n4️⃣ Нарисуйте глазами цифру 8\n5️⃣ Крепко зажмурьтесь, откройте глаза"""}
+    ],
+    # Креативные игры (41-50)
+    "creative": [
+        {"name": "Изобретение предметов", "task": """💡 **Придумай устройство**\n\n1️⃣ Объедините два случайных предмета\n2️⃣ Придумайте, как это может работать\n3️⃣ Например: зонт + лампа = светящийся зонт для вечерних прогулок\n4️⃣ Попробуйте: телефон + растение, часы + подушка"""},
+        {"name": "Альтернативное использование", "task": """🔄 **Необычное применение**\n\n1️⃣ Возьмите обычную скрепку\n2️⃣ Придумайте 20 способов ее использования\n3️⃣ Будьте креативны! (открывашка, украшение, инструмент...)\n4️⃣ Попробуйте с другими предметами"""},
+        {"name": "Создание историй", "task": """📚 **Мини-роман**\n\n1️⃣ Выберите 3 случайных слова\n2️⃣ Придумайте историю, используя все три\n3️⃣ Ограничение: ровно 50 слов\n4️⃣ Попробуйте слова: космос, бабушка, пицца"""},
+        {"name": "Дизайн логотипов", "task": """🎨 **Мысленный дизайн**\n\n1️⃣ Придумайте название новой компании\n2️⃣ Представьте логотип в деталях\n3️⃣ Какие цвета? Шрифт? Символы?\n4️⃣ Опишите логотип словами за 2 минуты"""},
+        {"name": "Музыкальная композиция", "task": """🎵 **Внутренний композитор**\n\n1️⃣ Выберите эмоцию (радость, грусть, энергия)\n2️⃣ Представьте мелодию для нее\n3️⃣ Какие инструменты? Темп? Ритм?\n4️⃣ 'Напойте' мелодию в голове 2 минуты"""},
+        {"name": "Планирование события", "task": """🎉 **Организатор праздника**\n\n1️⃣ Спланируйте идеальный день рождения\n2️⃣ Место, гости, еда, развлечения\n3️⃣ Бюджет 50,000 рублей\n4️⃣ Все детали от приглашений до подарков"""},
+        {"name": "Архитектурный проект", "task": """🏛️ **Домик мечты**\n\n1️⃣ Спроектируйте дом на 100 кв.м\n2️⃣ Сколько комнат? Их назначение?\n3️⃣ Стиль: современный, классический, эко?\n4️⃣ Участок: сад, бассейн, гараж?"""},
+        {"name": "Создание языка", "task": """🗣️ **Лингвист-изобретатель**\n\n1️⃣ Придумайте 10 слов на новом языке\n2️⃣ Для основных понятий: вода, еда, дом, любовь\n3️⃣ Как они звучат? Есть ли логика?\n4️⃣ Попробуйте составить простое предложение"""},
+        {"name": "Рецепт блюда", "task": """👨‍🍳 **Кулинарный шедевр**\n\n1️⃣ Создайте новое блюдо\n2️⃣ Объедините продукты, которые обычно не сочетают\n3️⃣ Подробный рецепт с пропорциями\n4️⃣ Как подавать? С чем сочетается?"""},
+        {"name": "Тренировка памяти", "task": """🧠 **Дворец памяти**\n\n1️⃣ Запомните список: молоко, ключи, зонт, книга, цветы, хлеб, телефон\n2️⃣ Создайте яркую историю, связывающую все предметы\n3️⃣ Через 5 минут воспроизведите список\n4️⃣ Попробуйте в обратном порядке!"""}
+    ]
+}
+
+_IMPULSE_INTERVENTIONS = {
+    "sweets": {
+        "title": "🍰 Импульс к сладкому",
+        "techniques": [
+            {
+                "name": "🥤 Замена напитком",
+                "instruction": "Выпейте стакан воды с лимоном или мятой. Часто жажда маскируется под тягу к сладкому."
+            },
+            {
+                "name": "⏰ Правило 10 минут",
+                "instruction": "Подождите 10 минут. Включите музыку или сделайте несколько упражнений. Импульс часто проходит сам."
+            },
+            {
+                "name": "🍎 Здоровая альтернатива",
+                "instruction": "Съешьте яблоко, банан или горсть орехов. Удовлетворите потребность в питательных веществах."
+            }
+        ]
+    },
+    "alcohol": {
+        "title": "🍷 Импульс к алкоголю",
+        "techniques": [
+            {
+                "name": "🫧 Безалкогольная замена",
+                "instruction": "Приготовьте безалкогольный мохито или выпейте газированную воду с лаймом из красивого бокала."
+            },
+            {
+                "name": "🧘‍♂️ Техника СТОП",
+                "instruction": "СТОП - остановитесь. Сделайте глубокий вдох. Осознайте эмоцию. Подумайте о последствиях. Примите решение."
+            },
+            {
+                "name": "🏃‍♀️ Смена обстановки",
+                "instruction": "Выйдите на улицу на 15 минут. Прогуляйтесь или сделайте несколько приседаний."
+            }
+        ]
+    },
+    "smoking": {
+        "title": "🚬 Импульс к курению",
+        "techniques": [
+            {
+                "name": "🫁 Дыхательная замена",
+                "instruction": "Имитируйте курение: глубоко вдохните воздух через сложенные трубочкой губы, задержите, медленно выдохните."
+            },
+            {
+                "name": "🥕 Жевательная замена",
+                "instruction": "Пожуйте морковку, сельдерей или жвачку без сахара. Занять рот - половина победы."
+            },
+            {
+                "name": "🤲 Занять руки",
+                "instruction": "Сожмите эспандер, покрутите ручку, порисуйте. Импульс курить часто связан с привычкой рук."
+            }
+        ]
+    },
+    "scrolling": {
+        "title": "📱 Импульс к скроллингу",
+        "techniques": [
+            {
+                "name": "📵 Убрать телефон",
+                "instruction": "Положите телефон в другую комнату на 20 минут. Из виду - из сердца."
+            },
+            {
+                "name": "📚 Замена активности",
+                "instruction": "Откройте книгу, включите подкаст или начните делать что-то руками."
+            },
+            {
+                "name": "⏰ Техника помидора",
+                "instruction": "Поставьте таймер на 25 минут. Займитесь полезным делом. После сигнала - 5 минут можно скроллить."
+            }
+        ]
+    },
+    "anger": {
+        "title": "😤 Импульс к злости",
+        "techniques": [
+            {
+                "name": "🧊 Холодная вода",
+                "instruction": "Умойтесь холодной водой или подержите кубик льда. Резкая смена температуры снижает агрессию."
+            },
+            {
+                "name": "🔢 Считаем до 10",
+                "instruction": "Медленно сосчитайте от 1 до 10, дыша глубоко. При сильной злости - до 100."
+            },
+            {
+                "name": "🏃‍♀️ Физическая разрядка",
+                "instruction": "Сделайте 10 отжиманий, приседаний или просто потрясите руками и ногами 30 секунд."
+            }
+        ]
+    },
+    "junkfood": {
+        "title": "🍔 Импульс к вредной еде",
+        "techniques": [
+            {
+                "name": "🥗 Правило тарелки",
+                "instruction": "Сначала съешьте салат или овощи. Часто после этого тяга к вредному пропадает."
+            },
+            {
+                "name": "🦷 Почистить зубы",
+                "instruction": "Почистите зубы мятной пастой. После этого есть не захочется 20-30 минут."
+            },
+            {
+                "name": "🤔 Голод или эмоция?",
+                "instruction": "Спросите себя: 'Я действительно голоден или это эмоции?' Если эмоции - займитесь ими."
+            }
+        ]
+    },
+    "shopping": {
+        "title": "🛒 Импульс к трате денег",
+        "techniques": [
+            {
+                "name": "🛒 Корзина желаний",
+                "instruction": "Добавьте товар в корзину, но не покупайте 24 часа. Часто желание проходит."
+            },
+            {
+                "name": "💰 Посчитайте в часах",
+                "instruction": "Переведите цену в часы работы: 'Это стоит 8 часов моей жизни. Оно того стоит?'"
+            },
+            {
+                "name": "📝 Список потребностей",
+                "instruction": "Запишите 3 вещи, которые вам реально нужны. Покупка есть в списке?"
+            }
+        ]
+    }
+}
+
+# Дыхательные техники (25)
+BREATHING_EXERCISES: Tuple[Mapping, ...] = _freeze(_BREATHING_EXERCISES)
+
+# Медитации и практики осознанности (25)
+MEDITATION_PRACTICES: Tuple[Mapping, ...] = _freeze(_MEDITATION_PRACTICES)
+
+# 100 уникальных коучинговых вопросов; id вопроса = индекс в кортеже
+COACHING_QUESTIONS: Tuple[str, ...] = tuple(_COACHING_QUESTIONS)
+
+# Отвлекающие мини-игры (30) с категорией: math, words, visual, physical, creative
+MINI_GAMES: Tuple[Mapping, ...] = _freeze([
+    {"category": category, **game}
+    for category, games in _MINI_GAMES.items()
+    for game in games
+])
+
+# Техники по типу импульса: ключ из callback_data impulse_<type>
+IMPULSE_INTERVENTIONS: Mapping[str, Mapping] = MappingProxyType({
+    impulse_type: MappingProxyType({
+        "title": impulse["title"],
+        "techniques": _freeze(impulse["techniques"])
+    })
+    for impulse_type, impulse in _IMPULSE_INTERVENTIONS.items()
+})
+
+DEFAULT_IMPULSE_TYPE = "sweets"
+
+
+def get_impulse_content(impulse_type: str) -> Mapping:
+    """Техники для типа импульса (неизвестный тип - техники по умолчанию)"""
+    return IMPULSE_INTERVENTIONS.get(impulse_type) or IMPULSE_INTERVENTIONS[DEFAULT_IMPULSE_TYPE]
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Материализованные счётчики пользователя
+Итоги и дневные корзины обновляются триггерами в той же транзакции, что и вставка события
+
+Пересчёт из сырых событий и дневных итогов хранения:
+    python counters.py [путь_к_базе] [таблица_результатов]
+"""
+
+import asyncio
+import logging
+import sys
+
+from db_pool import ConnectionManager, get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних дней хранится в user_daily_counters (кольцо)
+COUNTER_DAYS = 35
+
+
+class UserCounters:
+    """Счётчики обращений, попыток и успехов на пользователя.
+
+    ``user_counters`` - итоги (чтение по первичному ключу),
+    ``user_daily_counters`` - последние COUNTER_DAYS дней,
+    ``user_technique_counters`` - успехи по техникам, заменяет JSON
+    user_progress.technique_counts (сырых событий по техникам нет, поэтому
+    при пересчёте эта таблица не трогается).
+    Итоги и дни поддерживают триггеры на help_requests и ``outcomes_table``,
+    поэтому любой путь записи событий (EventSink, прямой INSERT) их обновляет.
+    """
+
+    def __init__(self, db: ConnectionManager, outcomes_table: str = "interventions"):
+        self.db = db
+        self.outcomes_table = outcomes_table
+
+    @staticmethod
+    async def create_schema(db, outcomes_table: str = "interventions"):
+        """Таблицы и триггеры счётчиков (внутри открытой транзакции).
+
+        Если таблица итогов создаётся впервые, она сразу заполняется из
+        уже накопленных событий.
+        """
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_counters'"
+        )
+        existed = await cursor.fetchone() is not None
+
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_counters (
+                user_id INTEGER PRIMARY KEY,
+                requests INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_daily_counters (
+                user_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                requests INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, day)
+            ) WITHOUT ROWID
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_technique_counters (
+                user_id INTEGER NOT NULL,
+                technique TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, technique)
+            ) WITHOUT ROWID
+        """)
+        await UserCounters._create_triggers(db, outcomes_table)
+
+        if not existed:
+            await UserCounters._rebuild(db, outcomes_table)
+            # Отдельных событий по техникам нет - переносим накопленное в user_progress
+            await db.execute("""
+                INSERT OR IGNORE INTO user_technique_counters (user_id, technique, count)
+                SELECT p.user_id, t.key, t.value
+                FROM user_progress p, json_each(p.technique_counts) t
+                WHERE json_valid(p.technique_counts)
+            """)
+
+    @staticmethod
+    async def _create_triggers(db, outcomes_table: str):
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_help_requests_counters
+            AFTER INSERT ON help_requests
+            BEGIN
+                INSERT INTO user_counters (user_id, requests) VALUES (NEW.user_id, 1)
+                ON CONFLICT (user_id) DO UPDATE
+                SET requests = requests + 1, updated_at = CURRENT_TIMESTAMP;
+                INSERT INTO user_daily_counters (user_id, day, requests)
+                VALUES (NEW.user_id, date(NEW.created_at), 1)
+                ON CONFLICT (user_id, day) DO UPDATE SET requests = requests + 1;
+                DELETE FROM user_daily_counters
+                WHERE user_id = NEW.user_id AND day < date(NEW.created_at, '-{COUNTER_DAYS} days');
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{outcomes_table}_counters_insert
+            AFTER INSERT ON {outcomes_table}
+            BEGIN
+                INSERT INTO user_counters (user_id, attempts, successes)
+                VALUES (NEW.user_id, 1, COALESCE(NEW.success, 0) != 0)
+                ON CONFLICT (user_id) DO UPDATE
+                SET attempts = attempts + 1,
+                    successes = successes + excluded.successes,
+                    updated_at = CURRENT_TIMESTAMP;
+                INSERT INTO user_daily_counters (user_id, day, attempts, successes)
+                VALUES (NEW.user_id, date(NEW.created_at), 1, COALESCE(NEW.success, 0) != 0)
+                ON CONFLICT (user_id, day) DO UPDATE
+                SET attempts = attempts + 1, successes = successes + excluded.successes;
+                DELETE FROM user_daily_counters
+                WHERE user_id = NEW.user_id AND day < date(NEW.created_at, '-{COUNTER_DAYS} days');
+            END
+        """)
+        # Попытка, отмеченная успешной позже (кнопка «помогло»)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{outcomes_table}_counters_success
+            AFTER UPDATE OF success ON {outcomes_table}
+            WHEN (COALESCE(OLD.success, 0) != 0) != (COALESCE(NEW.success, 0) != 0)
+            BEGIN
+                UPDATE user_counters
+                SET successes = successes + (CASE WHEN COALESCE(NEW.success, 0) != 0 THEN 1 ELSE -1 END),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = NEW.user_id;
+                UPDATE user_daily_counters
+                SET successes = successes + (CASE WHEN COALESCE(NEW.success, 0) != 0 THEN 1 ELSE -1 END)
+                WHERE user_id = NEW.user_id AND day = date(NEW.created_at);
+            END
+        """)
+
+    @staticmethod
+    async def _rebuild(db, outcomes_table: str, user_id=None):
+        where = "WHERE user_id = :user_id" if user_id is not None else ""
+        params = {"user_id": user_id, "since": f"-{COUNTER_DAYS} days"}
+
+        # События, уже свёрнутые RetentionJob, есть только в user_daily_rollups
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_daily_rollups'"
+        )
+        if await cursor.fetchone() is not None:
+            rollup_totals = f"""
+                UNION ALL
+                SELECT user_id, requests, attempts, successes
+                FROM user_daily_rollups {where}"""
+            rollup_days = f"""
+                UNION ALL
+                SELECT user_id, day, requests, attempts, successes
+                FROM user_daily_rollups {where}"""
+        else:
+            rollup_totals = rollup_days = ""
+
+        for table in ("user_counters", "user_daily_counters"):
+            await db.execute(f"DELETE FROM {table} {where}", params)
+
+        await db.execute(f"""
+            INSERT INTO user_counters (user_id, requests, attempts, successes)
+            SELECT user_id, SUM(requests), SUM(attempts), SUM(successes) FROM (
+                SELECT user_id, 1 AS requests, 0 AS attempts, 0 AS successes
+                FROM help_requests {where}
+                UNION ALL
+                SELECT user_id, 0, 1, COALESCE(success, 0) != 0
+                FROM {outcomes_table} {where}{rollup_totals}
+            )
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id
+        """, params)
+        await db.execute(f"""
+            INSERT INTO user_daily_counters (user_id, day, requests, attempts, successes)
+            SELECT user_id, date(created_at) AS day, SUM(requests), SUM(attempts), SUM(successes) FROM (
+                SELECT user_id, created_at, 1 AS requests, 0 AS attempts, 0 AS successes
+                FROM help_requests {where}
+                UNION ALL
+                SELECT user_id, created_at, 0, 1, COALESCE(success, 0) != 0
+                FROM {outcomes_table} {where}{rollup_days}
+            )
+            WHERE user_id IS NOT NULL AND created_at >= date('now', :since)
+            GROUP BY user_id, day
+        """, params)
+
+    async def rebuild(self, user_id=None):
+        """Пересчитать счётчики из сырых событий и дневных итогов (всех пользователей или одного)"""
+        async with self.db.writer() as db:
+            await self._create_triggers(db, self.outcomes_table)
+            await self._rebuild(db, self.outcomes_table, user_id)
+        logger.info(f"Счётчики пересчитаны ({'все пользователи' if user_id is None else user_id})")
+
+    def technique_increment(self, user_id: int, technique: str):
+        """Оператор (sql, params): +1 успех техники"""
+        return ("""
+            INSERT INTO user_technique_counters (user_id, technique, count) VALUES (?, ?, 1)
+            ON CONFLICT (user_id, technique) DO UPDATE SET count = count + 1
+        """, (user_id, technique))
+
+
+async def _main(argv):
+    db_path = argv[1] if len(argv) > 1 else "cravebreaker.db"
+    outcomes_table = argv[2] if len(argv) > 2 else "interventions"
+    manager = get_connection_manager(db_path)
+    try:
+        async with manager.writer() as db:
+            await UserCounters.create_schema(db, outcomes_table)
+        await UserCounters(manager, outcomes_table).rebuild()
+    finally:
+        await manager.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(sys.argv))
@@ -6,20 +6,33 @@
 Хранение данных пользователей, статистики и триггеров
 """
 
-import aiosqlite
 import logging
-from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
+from db_pool import get_connection_manager
+from event_sink import EventSink
+from counters import UserCounters
+from stats import StatsService
+from retention import RetentionJob
+
 logger = logging.getLogger(__name__)
 
 class Database:
     def __init__(self, db_path: str = "cravebreaker.db"):
         self.db_path = db_path
+        self.db = get_connection_manager(db_path)
+        self.events = EventSink(self.db)
+        self.counters = UserCounters(self.db, "intervention_outcomes")
+        self.stats = StatsService(self.db, "intervention_outcomes")
+        self.retention = RetentionJob(self.db, {
+            "help_requests": "requests",
+            "intervention_outcomes": "outcomes",
+            "user_triggers": "triggers",
+        }, sink=self.events)
     
     async def init_db(self):
         """Инициализация базы данных и создание таблиц"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.writer() as db:
             # Таблица пользователей
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -81,12 +94,16 @@ class Database:
                 )
             """)
             
-            await db.commit()
+            # Индексы и материализованные счётчики для статистики по пользователю
+            await StatsService.create_indexes(db, "intervention_outcomes")
+            await UserCounters.create_schema(db, "intervention_outcomes")
+            await RetentionJob.create_schema(db)
+            
             logger.info("База данных инициализирована")
     
     async def user_exists(self, user_id: int) -> bool:
         """Проверка существования пользователя"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.reader() as db:
             cursor = await db.execute(
                 "SELECT 1 FROM users WHERE user_id = ?", (user_id,)
             )
@@ -96,12 +113,11 @@ class Database:
     async def create_user(self, user_id: int, username: str) -> bool:
         """Создание нового пользователя"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db.writer() as db:
                 await db.execute(
                     "INSERT INTO users (user_id, username) VALUES (?, ?)",
                     (user_id, username)
                 )
-                await db.commit()
                 logger.info(f"Создан новый пользователь: {user_id} ({username})")
                 return True
         except Exception as e:
@@ -110,17 +126,16 @@ class Database:
     
     async def update_last_activity(self, user_id: int):
         """Обновление времени последней активности пользователя"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.writer() as db:
             await db.execute(
                 "UPDATE users SET last_activity = CURRENT_TIMESTAMP WHERE user_id = ?",
                 (user_id,)
             )
-            await db.commit()
     
     async def add_user_trigger(self, user_id: int, trigger_name: str) -> bool:
         """Добавление триггера пользователю"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db.writer() as db:
                 # Проверяем, нет ли уже такого триггера
                 cursor = await db.execute(
                     "SELECT 1 FROM user_triggers WHERE user_id = ? AND trigger_name = ?",
@@ -133,7 +148,6 @@ class Database:
                         "INSERT INTO user_triggers (user_id, trigger_name) VALUES (?, ?)",
                         (user_id, trigger_name)
                     )
-                    await db.commit()
                     logger.info(f"Добавлен триггер '{trigger_name}' для пользователя {user_id}")
                     return True
                 else:
@@ -145,7 +159,7 @@ class Database:
     
     async def get_user_triggers(self, user_id: int) -> List[str]:
         """Получение списка триггеров пользователя"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.reader() as db:
             cursor = await db.execute(
                 "SELECT trigger_name FROM user_triggers WHERE user_id = ? ORDER BY created_at",
                 (user_id,)
@@ -153,132 +167,52 @@ class Database:
             results = await cursor.fetchall()
             return [row[0] for row in results]
     
-    async def log_help_request(self, user_id: int):
-        """Логирование обращения за помощью"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT INTO help_requests (user_id) VALUES (?)",
-                (user_id,)
-            )
-            await db.commit()
-            await self.update_last_activity(user_id)
+    async def log_help_request(self, user_id: int, durable: bool = False):
+        """Логирование обращения за помощью (запись группами через EventSink)"""
+        await self.events.add(
+            "INSERT INTO help_requests (user_id) VALUES (?)",
+            (user_id,)
+        )
+        await self.events.add(
+            "UPDATE users SET last_activity = CURRENT_TIMESTAMP WHERE user_id = ?",
+            (user_id,), durable=durable
+        )
     
-    async def log_intervention_outcome(self, user_id: int, success: bool):
-        """Логирование результата интервенции"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT INTO intervention_outcomes (user_id, success) VALUES (?, ?)",
-                (user_id, success)
-            )
-            await db.commit()
-            await self.update_last_activity(user_id)
+    async def log_intervention_outcome(self, user_id: int, success: bool, durable: bool = False):
+        """Логирование результата интервенции (запись группами через EventSink)"""
+        await self.events.add(
+            "INSERT INTO intervention_outcomes (user_id, success) VALUES (?, ?)",
+            (user_id, success)
+        )
+        await self.events.add(
+            "UPDATE users SET last_activity = CURRENT_TIMESTAMP WHERE user_id = ?",
+            (user_id,), durable=durable
+        )
+    
+    async def close(self):
+        """Записать накопленные события и закрыть соединения"""
+        await self.events.stop()
+        await self.db.close()
     
     async def get_user_stats(self, user_id: int) -> Dict:
         """Получение статистики пользователя"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Общая статистика обращений
-            cursor = await db.execute(
-                "SELECT COUNT(*) FROM help_requests WHERE user_id = ?",
-                (user_id,)
-            )
-            total_requests = (await cursor.fetchone())[0]
-            
-            # Статистика интервенций
-            cursor = await db.execute(
-                "SELECT COUNT(*) FROM intervention_outcomes WHERE user_id = ?",
-                (user_id,)
-            )
-            total_interventions = (await cursor.fetchone())[0]
-            
-            cursor = await db.execute(
-                "SELECT COUNT(*) FROM intervention_outcomes WHERE user_id = ? AND success = 1",
-                (user_id,)
-            )
-            successful_interventions = (await cursor.fetchone())[0]
-            
-            # Статистика за последние 7 дней
-            week_ago = datetime.now() - timedelta(days=7)
-            cursor = await db.execute(
-                "SELECT COUNT(*) FROM help_requests WHERE user_id = ? AND created_at > ?",
-                (user_id, week_ago.isoformat())
-            )
-            weekly_requests = (await cursor.fetchone())[0]
-            
-            cursor = await db.execute(
-                "SELECT COUNT(*) FROM intervention_outcomes WHERE user_id = ? AND success = 1 AND created_at > ?",
-                (user_id, week_ago.isoformat())
-            )
-            weekly_successes = (await cursor.fetchone())[0]
-            
-            # Триггеры пользователя
-            triggers = await self.get_user_triggers(user_id)
-            
-            # Дата регистрации
-            cursor = await db.execute(
-                "SELECT created_at FROM users WHERE user_id = ?",
-                (user_id,)
-            )
-            registration_date = (await cursor.fetchone())[0]
-            
-            return {
-                'total_requests': total_requests,
-                'total_interventions': total_interventions,
-                'successful_interventions': successful_interventions,
-                'weekly_requests': weekly_requests,
-                'weekly_successes': weekly_successes,
-                'triggers': triggers,
-                'registration_date': registration_date,
-                'success_rate': (successful_interventions / total_interventions * 100) if total_interventions > 0 else 0
-            }
+        await self.events.flush()
+        return await self.stats.get_user_summary(user_id, days=7)
     
-    async def get_daily_stats(self, user_id: int, days: int = 7) -> List[Tuple[str, int, int]]:
-        """Получение ежедневной статистики за последние N дней"""
-        stats = []
-        for i in range(days):
-            date = datetime.now() - timedelta(days=i)
-            date_str = date.strftime('%Y-%m-%d')
-            
-            async with aiosqlite.connect(self.db_path) as db:
-                # Количество обращений за день
-                cursor = await db.execute(
-                    """SELECT COUNT(*) FROM help_requests 
-                       WHERE user_id = ? AND DATE(created_at) = ?""",
-                    (user_id, date_str)
-                )
-                requests = (await cursor.fetchone())[0]
-                
-                # Количество успешных интервенций за день
-                cursor = await db.execute(
-                    """SELECT COUNT(*) FROM intervention_outcomes 
-                       WHERE user_id = ? AND success = 1 AND DATE(created_at) = ?""",
-                    (user_id, date_str)
-                )
-                successes = (await cursor.fetchone())[0]
-                
-                stats.append((date_str, requests, successes))
-        
-        return list(reversed(stats))  # От старых к новым
+    async def get_daily_stats(self, user_id: int, days: int = 7,
+                              bucket: str = "day") -> List[Tuple[str, int, int]]:
+        """Статистика за последние N дней (bucket="week"/"month" - N недель/месяцев)"""
+        await self.events.flush()
+        return await self.stats.get_history(user_id, days, bucket)
     
-    async def cleanup_old_data(self, days: int = 90):
-        """Очистка старых данных (старше N дней)"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "DELETE FROM help_requests WHERE created_at < ?",
-                (cutoff_date.isoformat(),)
-            )
-            await db.execute(
-                "DELETE FROM intervention_outcomes WHERE created_at < ?",
-                (cutoff_date.isoformat(),)
-            )
-            await db.commit()
-            logger.info(f"Очищены данные старше {days} дней")
+    async def cleanup_old_data(self, days: int = 90) -> Dict:
+        """Очистка старых данных (старше N дней) со сворачиванием в дневные итоги"""
+        return await self.retention.run(days)
     
     # User progress methods (no gamification)
     async def get_user_progress(self, user_id: int) -> Dict:
         """Get user progress without gamification"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.writer() as db:
             cursor = await db.execute(
                 """SELECT total_interventions, current_streak, longest_streak,
                    last_intervention_date, technique_counts, weekend_interventions,
@@ -294,7 +228,6 @@ class Database:
                     """INSERT INTO user_progress (user_id) VALUES (?)""",
                     (user_id,)
                 )
-                await db.commit()
                 return {
                     "total_interventions": 0, "current_streak": 0,
                     "longest_streak": 0, "last_intervention_date": None,
@@ -313,7 +246,7 @@ class Database:
     
     async def update_user_progress(self, user_id: int, progress_data: Dict):
         """Update user progress without gamification"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.writer() as db:
             await db.execute(
                 """UPDATE user_progress SET 
                    total_interventions = ?, current_streak = ?,
@@ -334,6 +267,5 @@ class Database:
                     user_id
                 )
             )
-            await db.commit()
     
     # Badge methods removed - no gamification
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Менеджер соединений SQLite
+Одно долгоживущее соединение для записи и небольшой пул соединений для чтения (WAL)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """Соединения с одной базой для бота или Database.
+
+    Соединения и примитивы asyncio привязаны к event loop, в котором
+    открыты: у каждого экземпляра бота (и его потока) свой менеджер.
+    Запись идёт через единственное соединение под asyncio.Lock: блок
+    ``async with manager.writer() as db`` выполняется как одна транзакция
+    (commit при выходе, rollback при исключении). Чтение берёт соединение из
+    пула ``reader()`` и в режиме WAL не блокируется писателем.
+    """
+
+    def __init__(self, db_path: str, readers: Optional[int] = None,
+                 cache_size_kb: Optional[int] = None, mmap_size: Optional[int] = None,
+                 busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.in_memory = db_path == ":memory:"
+        # У :memory: каждое соединение - своя база, поэтому читаем через писателя
+        self.readers = 0 if self.in_memory else (
+            readers if readers is not None else int(os.getenv("DB_READERS", "3"))
+        )
+        self.cache_size_kb = cache_size_kb or int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+        self.mmap_size = mmap_size if mmap_size is not None else int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+        self.busy_timeout_ms = busy_timeout_ms
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._reader_pool: Optional[asyncio.Queue] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._open_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _configure(self, db: aiosqlite.Connection, read_only: bool = False):
+        await db.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        await db.execute("PRAGMA synchronous = NORMAL")
+        await db.execute(f"PRAGMA cache_size = -{self.cache_size_kb}")
+        await db.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        await db.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            await db.execute("PRAGMA query_only = ON")
+
+    async def open(self):
+        """Открыть соединения (вызывается лениво при первом запросе)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Бот может быть перезапущен в новом потоке со своим event loop:
+            # примитивы asyncio привязаны к старому, поэтому пересоздаём всё
+            if self._loop is not None:
+                await self.close()
+            self._loop = loop
+            self._open_lock = asyncio.Lock()
+        if self._writer is not None:
+            return
+
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            writer = await aiosqlite.connect(self.db_path)
+            # Действует для новой базы; существующую переводит RetentionJob через VACUUM
+            await writer.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if not self.in_memory:
+                await writer.execute("PRAGMA journal_mode = WAL")
+            await self._configure(writer)
+
+            self._reader_pool = asyncio.Queue()
+            for _ in range(self.readers):
+                reader = await aiosqlite.connect(self.db_path)
+                await self._configure(reader, read_only=True)
+                self._readers.append(reader)
+                self._reader_pool.put_nowait(reader)
+
+            self._write_lock = asyncio.Lock()
+            self._writer = writer
+            logger.info(f"Соединения с БД открыты: {self.db_path} (читателей: {self.readers})")
+
+    @asynccontextmanager
+    async def writer(self):
+        """Соединение для записи; весь блок - одна транзакция"""
+        await self.open()
+        requested = time.perf_counter()
+        async with self._write_lock:
+            acquired = time.perf_counter()
+            metrics.observe("db_wait_seconds", acquired - requested, op="write")
+            try:
+                yield self._writer
+            except BaseException:
+                metrics.inc("db_errors_total", op="write")
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+            finally:
+                metrics.observe("db_seconds", time.perf_counter() - acquired, op="write")
+
+    @asynccontextmanager
+    async def reader(self):
+        """Соединение только для чтения из пула"""
+        await self.open()
+        if not self.readers:
+            async with self.writer() as db:
+                yield db
+            return
+        requested = time.perf_counter()
+        db = await self._reader_pool.get()
+        acquired = time.perf_counter()
+        metrics.observe("db_wait_seconds", acquired - requested, op="read")
+        try:
+            yield db
+        except BaseException:
+            metrics.inc("db_errors_total", op="read")
+            raise
+        finally:
+            self._reader_pool.put_nowait(db)
+            metrics.observe("db_seconds", time.perf_counter() - acquired, op="read")
+
+    async def close(self):
+        """Закрыть все соединения"""
+        connections = self._readers + ([self._writer] if self._writer is not None else [])
+        self._writer = None
+        self._readers = []
+        self._reader_pool = None
+        for db in connections:
+            try:
+                await db.close()
+            except Exception as e:
+                logger.error(f"Ошибка закрытия соединения с БД: {e}")
+        if connections:
+            logger.info(f"Соединения с БД закрыты: {self.db_path}")
+
+
+_managers: Dict[Tuple[str, Optional[asyncio.AbstractEventLoop]], ConnectionManager] = {}
+
+
+def get_connection_manager(db_path: str = "cravebreaker.db") -> ConnectionManager:
+    """Общий менеджер соединений для файла базы данных в текущем event loop.
+
+    Боты в разных потоках работают в разных loop и получают разные
+    менеджеры: открытие в новом loop не закрывает чужие живые соединения.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for key in [key for key in _managers if key[1] is not None and key[1].is_closed()]:
+        del _managers[key]
+    path = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    key = (path, loop)
+    if key not in _managers:
+        _managers[key] = ConnectionManager(db_path)
+    return _managers[key]
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Диспетчер обновлений Telegram
+Параллельная обработка обновлений пулом воркеров с сохранением порядка внутри чата
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateDispatcher:
+    """Распределяет обновления по ограниченному пулу asyncio-воркеров.
+
+    Обновления одного чата обрабатываются строго по очереди, разные чаты -
+    параллельно. Когда в очереди ``max_pending`` необработанных обновлений,
+    ``submit`` ждёт освобождения места (backpressure для цикла polling).
+    """
+
+    def __init__(self, handler: Callable[[Dict], Awaitable[None]],
+                 concurrency: int = 8, max_pending: int = 256):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self._chats: Dict[int, Deque[Dict]] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending = 0
+
+    @staticmethod
+    def chat_key(update: Dict) -> int:
+        """Ключ упорядочивания: id чата, иначе id пользователя, иначе update_id"""
+        payload = update.get("message") or update.get("edited_message") or update.get("callback_query")
+        if payload:
+            message = payload.get("message", payload)
+            if "chat" in message:
+                return message["chat"]["id"]
+            if "from" in payload:
+                return payload["from"]["id"]
+        return update.get("update_id", 0)
+
+    @property
+    def pending(self) -> int:
+        """Количество принятых, но ещё не обработанных обновлений"""
+        return self._pending
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """Запуск воркеров (идемпотентно)"""
+        if self._workers:
+            return
+        self._ready = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"update-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"Диспетчер обновлений запущен: воркеров={self.concurrency}, очередь={self.max_pending}")
+
+    async def submit(self, update: Dict):
+        """Поставить обновление в очередь; блокируется, если очередь заполнена"""
+        if not self._workers:
+            await self.start()
+        await self._slots.acquire()
+        self._pending += 1
+        key = self.chat_key(update)
+        chat_queue = self._chats.get(key)
+        if chat_queue is None:
+            # Чат не обрабатывается и не ждёт - отдаём его свободному воркеру
+            self._chats[key] = deque([update])
+            self._ready.put_nowait(key)
+        else:
+            # Чат уже в работе - обновление дождётся предыдущих
+            chat_queue.append(update)
+
+    async def join(self):
+        """Дождаться обработки всех принятых обновлений"""
+        if self._ready is not None:
+            await self._ready.join()
+
+    async def stop(self, drain: bool = True):
+        """Остановка воркеров; при drain=True сначала дообрабатываем очередь"""
+        if not self._workers:
+            return
+        if drain:
+            await self.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._chats.clear()
+        self._pending = 0
+        logger.info("Диспетчер обновлений остановлен")
+
+    async def _worker(self, index: int):
+        while True:
+            key = await self._ready.get()
+            chat_queue = self._chats[key]
+            update = chat_queue.popleft()
+            try:
+                await self.handler(update)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.inc("dispatcher_errors_total")
+                logger.error(f"Ошибка обработки обновления {update.get('update_id')} (воркер {index}): {e}")
+            finally:
+                self._pending -= 1
+                self._slots.release()
+                if chat_queue:
+                    # Возвращаем чат в конец очереди, чтобы не занимать воркер одним активным чатом
+                    self._ready.put_nowait(key)
+                else:
+                    del self._chats[key]
+                self._ready.task_done()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Отложенная запись событий (write-behind)
+Накопление вставок событий в памяти и групповой commit одной транзакцией
+"""
+
+import asyncio
+import logging
+import os
+import time
+from itertools import groupby
+from typing import List, Optional, Sequence, Tuple
+
+from db_pool import ConnectionManager
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EventSink:
+    """Буфер событий с групповой фиксацией.
+
+    Операторы выполняются строго в порядке добавления: размер буфера
+    достиг ``max_batch`` или прошло ``flush_interval`` секунд - весь буфер
+    пишется одной транзакцией (один fsync вместо одного на каждое нажатие).
+    ``durable=True`` фиксирует событие до возврата из ``add``.
+    """
+
+    def __init__(self, db: ConnectionManager, max_batch: Optional[int] = None,
+                 flush_interval: Optional[float] = None):
+        self.db = db
+        self.max_batch = max_batch or int(os.getenv("EVENT_SINK_MAX_BATCH", "200"))
+        self.flush_interval = flush_interval or float(os.getenv("EVENT_SINK_FLUSH_INTERVAL", "0.5"))
+        self._buffer: List[Tuple[str, Sequence]] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Количество событий, ещё не записанных в базу"""
+        return len(self._buffer)
+
+    async def start(self):
+        """Запуск фоновой периодической записи"""
+        if self._task is None or self._task.done():
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._flush_periodically(), name="event-sink")
+
+    async def add(self, sql: str, params: Sequence = (), durable: bool = False):
+        """Добавить оператор в буфер; durable=True - дождаться commit"""
+        self._buffer.append((sql, tuple(params)))
+        if durable or len(self._buffer) >= self.max_batch:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Записать накопленные события одной транзакцией"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, []
+            started = time.perf_counter()
+            try:
+                async with self.db.writer() as db:
+                    # Подряд идущие одинаковые операторы - одним executemany
+                    for sql, group in groupby(batch, key=lambda item: item[0]):
+                        await db.executemany(sql, [params for _, params in group])
+            except Exception as e:
+                metrics.inc("event_sink_errors_total")
+                logger.error(f"Ошибка групповой записи {len(batch)} событий: {e}; пишем по одному")
+                await self._write_one_by_one(batch)
+            metrics.observe("event_sink_flush_seconds", time.perf_counter() - started)
+            metrics.inc("event_sink_events_total", len(batch))
+            return len(batch)
+
+    async def _write_one_by_one(self, batch: List[Tuple[str, Sequence]]):
+        for sql, params in batch:
+            try:
+                async with self.db.writer() as db:
+                    await db.execute(sql, params)
+            except Exception as e:
+                logger.error(f"Событие отброшено ({sql.split()[0]} {params}): {e}")
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка фоновой записи событий: {e}")
+
+    async def stop(self):
+        """Остановить фоновую запись и сбросить остаток буфера"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        written = await self.flush()
+        if written:
+            logger.info(f"При остановке записано событий: {written}")
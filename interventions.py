@@ -7,302 +7,30 @@
 """
 
 import random
-import json
-import aiosqlite
 from typing import Dict, List
 
+from coaching_deck import CoachingDeck
+from content import BREATHING_EXERCISES, COACHING_QUESTIONS, MINI_GAMES
+from db_pool import get_connection_manager
+
 class InterventionManager:
     def __init__(self, db_path="cravebreaker.db"):
         self.db_path = db_path
-        self.breathing_exercises = self._init_breathing_exercises()
-        self.coaching_questions = self._init_coaching_questions()
-        self.mini_games = self._init_mini_games()
-    
-    def _init_breathing_exercises(self) -> List[Dict]:
-        """Инициализация дыхательных техник"""
-        return [
-            {
-                "name": "4-7-8 дыхание",
-                "instruction": """🫁 **Техника 4-7-8**
-
-1️⃣ Вдохните через нос на 4 счета
-2️⃣ Задержите дыхание на 7 счетов  
-3️⃣ Выдохните через рот на 8 счетов
-4️⃣ Повторите 3-4 раза
-
-Эта техника помогает активировать парасимпатическую нервную систему и снизить стресс.""",
-                "duration": 60
-            },
-            {
-                "name": "Квадратное дыхание",
-                "instruction": """🟦 **Квадратное дыхание**
-
-1️⃣ Вдох на 4 счета
-2️⃣ Задержка на 4 счета
-3️⃣ Выдох на 4 счета  
-4️⃣ Задержка на 4 счета
-🔄 Повторите 5-6 раз
-
-Представьте, что рисуете квадрат дыханием. Это поможет сосредоточиться и успокоиться.""",
-                "duration": 80
-            },
-            {
-                "name": "Дыхание животом",
-                "instruction": """🤰 **Диафрагмальное дыхание**
-
-1️⃣ Положите одну руку на грудь, другую на живот
-2️⃣ Медленно вдыхайте носом, расширяя живот
-3️⃣ Медленно выдыхайте ртом, сжимая живот
-4️⃣ Грудь должна почти не двигаться
-
-Дышите глубоко и спокойно 1-2 минуты.""",
-                "duration": 90
-            },
-            {
-                "name": "Дыхание 5-5",
-                "instruction": """⚖️ **Равномерное дыхание 5-5**
-
-1️⃣ Вдохните на 5 счетов
-2️⃣ Выдохните на 5 счетов
-3️⃣ Без задержек дыхания
-4️⃣ Повторите 8-10 раз
-
-Сосредоточьтесь только на счете. Пусть это будет единственной мыслью в голове.""",
-                "duration": 75
-            }
-        ]
-    
-    def _init_coaching_questions(self) -> List[str]:
-        """Инициализация 100 уникальных коучинговых вопросов"""
-        return [
-            # Вопросы о будущем (1-20)
-            "🤔 Что я почувствую через 10 минут, если НЕ поддамся этому импульсу?",
-            "🌟 Что я буду чувствовать завтра утром, если справлюсь с этим импульсом?",
-            "⏰ Как я буду относиться к этому моменту через час?",
-            "📅 Будет ли мне стыдно за это завтра?",
-            "🎯 Приближает ли этот выбор меня к моей мечте?",
-            "🔮 Каким человеком я стану, если продолжу сопротивляться?",
-            "🌅 Что изменится в моей жизни, если я устою сегодня?",
-            "📈 Как этот выбор повлияет на мой прогресс через неделю?",
-            "🏆 Каким будет мой следующий уровень, если я не сдамся?",
-            "✨ О чем я буду мечтать, если справлюсь с этим?",
-            "🌱 Какие возможности откроются, если я устою?",
-            "💫 Какую версию себя я хочу увидеть через месяц?",
-            "🚀 К какой цели это меня приблизит?",
-            "⭐ Что произойдет, если я стану сильнее этого импульса?",
-            "🎪 Какой праздник я себе устрою, если справлюсь?",
-            "🌈 Какое действие приблизит меня к тому человеку, которым я хочу стать?",
-            "🎁 Какой подарок будущему себе я делаю прямо сейчас?",
-            "🔥 Насколько горжусь собой буду через год?",
-            "💎 Какой драгоценный опыт я получу, если устою?",
-            "🎯 Как этот выбор соотносится с моими долгосрочными целями?",
-
-            # Альтернативы и замещения (21-40)
-            "💭 Какую альтернативу я могу выбрать прямо сейчас?",
-            "🎁 Какой подарок я могу сделать себе вместо этого?",
-            "🌿 Что полезного я могу сделать в эту минуту?",
-            "📚 Чему новому я могу научиться вместо этого?",
-            "🏃‍♂️ Какое движение поможет мне переключиться?",
-            "🎨 Во что творческое я могу вложить эту энергию?",
-            "📞 С кем я могу поговорить вместо этого?",
-            "🎵 Какая музыка поможет мне изменить настрой?",
-            "📝 Что важного я могу записать или спланировать?",
-            "🌺 Что красивое я могу создать или увидеть?",
-            "💧 Что освежающее я могу выпить или съесть?",
-            "🧘‍♀️ Какое упражнение поможет мне расслабиться?",
-            "📖 Что вдохновляющее я могу прочитать?",
-            "🚶‍♀️ Куда я могу пойти, чтобы изменить обстановку?",
-            "🧹 Что я могу привести в порядок вокруг себя?",
-            "💌 Кому я могу написать приятное сообщение?",
-            "🎯 На какой позитивной цели я могу сосредоточиться?",
-            "🌱 Что я могу сделать для своего здоровья?",
-            "💡 Какую идею я могу развить вместо этого?",
-            "⏰ Могу ли я отложить это решение на 15 минут?",
-
-            # Самоанализ и понимание (41-60)
-            "🔍 Что на самом деле происходит со мной сейчас? Усталость? Стресс? Скука?",
-            "🧘‍♀️ Что мое тело на самом деле пытается мне сказать?",
-            "😌 Что бы я посоветовал близкому другу в такой ситуации?",
-            "💭 Какие мысли привели меня к этому моменту?",
-            "🎭 Какая эмоция скрывается за этим желанием?",
-            "🌊 Что я на самом деле пытаюсь заглушить или избежать?",
-            "🔥 От чего я пытаюсь убежать с помощью этой привычки?",
-            "🎪 Какую потребность я пытаюсь удовлетворить таким образом?",
-            "🌙 Что мне не хватает в жизни прямо сейчас?",
-            "💝 Чего я на самом деле жажду?",
-            "🗝️ Какой урок скрыт в этом моменте искушения?",
-            "🎨 Какие чувства я пытаюсь изменить?",
-            "🌱 Что этот импульс говорит о моих потребностях?",
-            "🔮 Какую пустоту я пытаюсь заполнить?",
-            "🎭 Какую роль играет эта привычка в моей жизни?",
-            "🌊 Как долго длится это желание обычно?",
-            "💡 Что запустило этот импульс сегодня?",
-            "🎯 Каких ресурсов мне не хватает сейчас?",
-            "🌿 Что мой организм действительно просит?",
-            "🎪 Какой сигнал подает мне мое подсознание?",
-
-            # Прошлый опыт и мотивация (61-80)
-            "🏆 Когда я в последний раз гордился собой за то, что устоял?",
-            "💪 Какая моя сильная сторона поможет мне сейчас устоять?",
-            "🌟 Какой мой самый яркий момент победы над собой?",
-            "🎯 Что помогло мне справиться в прошлый раз?",
-            "❤️ Кто в меня верит и поддерживает?",
-            "🔥 Какое мое самое важное 'почему'?",
-            "🌈 За что я больше всего благодарен в жизни?",
-            "💎 Какие мои главные ценности?",
-            "🌟 Какие качества во мне восхищают других?",
-            "🎪 Какой мой самый большой источник гордости?",
-            "🌱 Какой прогресс я уже сделал?",
-            "🏆 Какую победу над собой я помню лучше всего?",
-            "💖 Кого я люблю настолько, чтобы стать лучше?",
-            "🎯 Ради чего я готов меняться?",
-            "✨ Какая моя суперсила в трудные моменты?",
-            "🌊 Как я справлялся с этим раньше?",
-            "🔥 Что дает мне силы продолжать?",
-            "💪 В какие свои способности я точно верю?",
-            "🎨 Что делает меня уникальным?",
-            "🌟 Какой комплимент я себе больше всего заслуживаю?",
-
-            # Долгосрочная перспектива и ценности (81-100)
-            "❤️ Что важнее для меня в долгосрочной перспективе?",
-            "🚀 Как я могу превратить этот момент в победу?",
-            "🎯 Какие мои самые важные жизненные приоритеты?",
-            "💖 Какую любовь к себе я могу проявить сейчас?",
-            "🌱 Как этот выбор повлияет на мою самооценку?",
-            "🎪 Какую историю о себе я хочу рассказывать?",
-            "✨ Какой пример я подаю окружающим?",
-            "🌊 Что значит для меня быть сильным человеком?",
-            "💎 Какие принципы определяют мою личность?",
-            "🔥 За что я хочу, чтобы меня помнили?",
-            "🎨 Какой след я хочу оставить в мире?",
-            "🌟 Что делает мою жизнь значимой?",
-            "💫 Какой я хочу видеть свою историю?",
-            "🎯 Какой вклад я хочу внести в жизни близких?",
-            "🌈 Какой смысл я вкладываю в свои поступки?",
-            "🏆 Какое наследие я хочу оставить?",
-            "💪 Что означает для меня честность перед собой?",
-            "🌱 Какие мои действия отражают мои истинные ценности?",
-            "✨ Как я хочу чувствовать себя в конце дня?",
-            "🎁 Какую версию себя я выбираю прямо сейчас?"
-        ]
-    
-    def _init_mini_games(self) -> List[Dict]:
-        """Инициализация мини-игр для отвлечения"""
-        return [
-            {
-                "name": "Счет наоборот",
-                "description": "Игра на концентрацию и отвлечение внимания",
-                "task": """🔢 Считайте в обратном порядке от 100 до 1, но:
-
-▪️ Пропускайте все числа, содержащие цифру 7
-▪️ Вместо чисел, кратных 5, говорите 'БУМ'
-▪️ При ошибке начинайте сначала
-
-Пример: 100, 99, 98, 96, БУМ, 94, 93, 92, 91, БУМ...
-
-Эта игра требует полной концентрации и отвлечет от импульса!"""
-            },
-            {
-                "name": "Анаграммы",
-                "description": "Словесная игра для переключения внимания",
-                "task": f"""🔤 Составьте как можно больше слов из букв слова:
-
-**'{random.choice(['ПСИХОЛОГИЯ', 'МОТИВАЦИЯ', 'КОНЦЕНТРАЦИЯ', 'ДОСТИЖЕНИЕ', 'УПОРСТВО'])}'**
-
-Правила:
-▪️ Каждую букву можно использовать только столько раз, сколько она встречается в исходном слове
-▪️ Слова должны быть не короче 3 букв
-▪️ Придумайте минимум 10 слов
-
-Время пошло! 🕐"""
-            },
-            {
-                "name": "Цветовая медитация",
-                "description": "Визуализация для успокоения и отвлечения",
-                "task": """🌈 Цветовая визуализация:
-
-1️⃣ Закройте глаза
-2️⃣ Представьте красный цвет - где вы его видите?
-3️⃣ Медленно переходите к оранжевому
-4️⃣ Затем к желтому, зеленому, голубому, синему, фиолетовому
-5️⃣ Для каждого цвета придумайте 3 предмета такого цвета
-6️⃣ Представьте, как эти цвета плавно перетекают друг в друга
-
-Потратьте на каждый цвет минимум 20 секунд."""
-            },
-            {
-                "name": "Математические паззлы",
-                "description": "Логическая задача для активации аналитического мышления",
-                "task": f"""🧮 Решите задачу:
-
-**Задача #{random.randint(1, 5)}:**
-
-{random.choice([
-    'Если 2 курицы несут 2 яйца за 2 дня, сколько яиц снесут 6 куриц за 6 дней?',
-    'У вас есть 3 коробки: в одной только красные шары, в другой только синие, в третьей - красные и синие. Все коробки подписаны неправильно. Достав один шар из одной коробки, как определить содержимое всех коробок?',
-    'Число увеличили на 25%, а затем уменьшили на 20%. Больше или меньше стало число и на сколько процентов?',
-    'В пруду растут лилии. Каждый день их количество удваивается. Если пруд полностью покроется лилиями за 30 дней, за сколько дней покроется половина пруда?',
-    'Есть 12 монет, одна фальшивая (легче). Как за 3 взвешивания на весах найти фальшивую монету?'
-])}
-
-Подумайте логически и найдите решение! 🤓"""
-            },
-            {
-                "name": "Ритм и движение",
-                "description": "Физическая активность для смены состояния",
-                "task": """🎵 Ритмическое упражнение:
-
-1️⃣ Встаньте прямо
-2️⃣ Хлопайте в ладоши в таком ритме: хлоп-хлоп-пауза-хлоп
-3️⃣ Добавьте движение правой ногой в том же ритме
-4️⃣ Теперь левой ногой в противоположном ритме
-5️⃣ Добавьте кивание головой каждые 4 счета
-6️⃣ Продолжайте 1-2 минуты
-
-Сосредоточьтесь на координации движений. Это перенаправит ваше внимание и энергию! 💃🕺"""
-            }
-        ]
+        self.db = get_connection_manager(db_path)
+        # Общий с ботом реестр контента (content.py)
+        self.breathing_exercises = BREATHING_EXERCISES
+        self.coaching_questions = COACHING_QUESTIONS
+        self.mini_games = MINI_GAMES
+        self.coaching_deck = CoachingDeck(self.db, len(COACHING_QUESTIONS))
     
     def get_breathing_exercise(self) -> Dict:
         """Получить случайную дыхательную технику"""
         return random.choice(self.breathing_exercises)
     
     async def get_coaching_question(self, user_id: int) -> str:
-        """Получить уникальный коучинговый вопрос с отслеживанием использованных"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Получаем данные о пользователе
-            async with db.execute("SELECT used_coaching_questions FROM users WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                used_questions = json.loads(row[0] if row and row[0] else "[]")
-        
-        # Если все вопросы использованы, сбрасываем список
-        if len(used_questions) >= len(self.coaching_questions):
-            used_questions = []
-        
-        # Находим неиспользованные вопросы
-        available_questions = [
-            q for i, q in enumerate(self.coaching_questions) 
-            if i not in used_questions
-        ]
-        
-        # Выбираем случайный вопрос
-        if available_questions:
-            question = random.choice(available_questions)
-            question_index = self.coaching_questions.index(question)
-            used_questions.append(question_index)
-            
-            # Обновляем базу данных
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
-                    "UPDATE users SET used_coaching_questions = ? WHERE user_id = ?",
-                    (json.dumps(used_questions), user_id)
-                )
-                await db.commit()
-            
-            return question
-        else:
-            # На случай ошибки - возвращаем первый вопрос
-            return self.coaching_questions[0]
+        """Получить уникальный коучинговый вопрос (колода без повторений, общая с ботом)"""
+        question_id = await self.coaching_deck.draw(user_id)
+        return self.coaching_questions[question_id]
     
     def get_mini_game(self) -> Dict:
         """Получить случайную мини-игру"""
@@ -333,7 +61,7 @@ class InterventionManager:
         elif any('смартфон' in trigger.lower() for trigger in user_triggers):
             return {
                 'type': 'game',
-                'content': random.choice([g for g in self.mini_games if 'концентрацию' in g['description']])
+                'content': random.choice([g for g in self.mini_games if g['category'] == 'math'])
             }
         else:
             # Общая интервенция
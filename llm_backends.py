@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Бэкенды генерации текста для мотивационных цитат
+OpenAI для продакшена и локальная детерминированная замена для нагрузочных тестов без сети
+"""
+
+import abc
+import asyncio
+import hashlib
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+try:
+    from openai import AsyncOpenAI
+except ImportError:
+    AsyncOpenAI = None
+
+
+class CompletionBackend(abc.ABC):
+    """Интерфейс бэкенда: chat-сообщения -> текст ответа (или None)"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def complete(self, messages: List[Dict], max_tokens: int, temperature: float) -> Optional[str]:
+        """Текст ответа модели или None"""
+
+
+class OpenAIBackend(CompletionBackend):
+    """Асинхронный клиент OpenAI; создаётся лениво в том event loop, где используется"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, timeout: float, model: str = "gpt-4o"):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.model = model
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def complete(self, messages: List[Dict], max_tokens: int, temperature: float) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # max_retries=0: повтор после таймаута всё равно не успеет к дедлайну
+            self._client = AsyncOpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+            self._loop = loop
+        response = await self._client.chat.completions.create(
+            model=self.model,  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+
+
+class StandInBackend(CompletionBackend):
+    """Локальная замена LLM: детерминированный ответ, заданные задержка и доля ошибок.
+
+    ``blocking=True`` имитирует синхронный клиент (time.sleep в event loop) -
+    чтобы сравнить с асинхронным вызовом в бенчмарке.
+    """
+
+    name = "standin"
+
+    QUOTES = (
+        "🌟 Каждый осознанный выбор делает тебя сильнее, чем вчера.",
+        "🚀 Ты уже доказал себе, что импульс - это не приказ.",
+        "🌱 Маленькие победы складываются в большую перемену.",
+        "💪 Твоя серия - это история о силе, которую ты пишешь сам.",
+        "🧭 Пауза перед действием - твой компас к цели.",
+    )
+
+    def __init__(self, latency: float = 0.3, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0, blocking: bool = False):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.blocking = blocking
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    async def complete(self, messages: List[Dict], max_tokens: int, temperature: float) -> Optional[str]:
+        self.calls += 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        failed = self._random.random() < self.failure_rate
+        if self.blocking:
+            time.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+        if failed:
+            raise RuntimeError("stand-in backend failure")
+        digest = hashlib.sha1(messages[-1]["content"].encode("utf-8")).digest()
+        return self.QUOTES[digest[0] % len(self.QUOTES)]
+
+
+def create_backend_from_env() -> Optional[CompletionBackend]:
+    """Бэкенд по LLM_BACKEND: openai (по умолчанию при наличии ключа), standin или none"""
+    kind = os.environ.get("LLM_BACKEND", "").lower()
+    api_key = os.environ.get("OPENAI_API_KEY")
+    timeout = float(os.environ.get("OPENAI_TIMEOUT", "4"))
+
+    if kind == "standin":
+        return StandInBackend(
+            latency=float(os.environ.get("LLM_STANDIN_LATENCY", "0.3")),
+            jitter=float(os.environ.get("LLM_STANDIN_JITTER", "0.2")),
+            failure_rate=float(os.environ.get("LLM_STANDIN_FAILURE_RATE", "0.0"))
+        )
+    if kind in ("", "openai") and AsyncOpenAI is not None and api_key:
+        return OpenAIBackend(api_key, timeout)
+    return None
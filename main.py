@@ -13,8 +13,9 @@ import signal
 import sys
 import threading
 import time
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from simple_bot import SimpleDearCraveBreakerBot
+from metrics import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -29,8 +30,12 @@ app = Flask(__name__)
 # Global bot instance and control variables
 bot_instance = None
 bot_task = None
+bot_thread = None
 running = True
 
+# How long shutdown waits for the bot to drain queues and flush buffered events
+SHUTDOWN_TIMEOUT = float(os.getenv('BOT_SHUTDOWN_TIMEOUT', '20'))
+
 @app.route('/')
 def health_check():
     """Health check endpoint for Cloud Run deployment - always returns 200 for deployment success"""
@@ -74,10 +79,33 @@ def status():
         'bot_status': 'running' if bot_instance else 'not_started',
         'bot_token_configured': bool(os.getenv('PRODUCTION_TELEGRAM_BOT_TOKEN')),
         'environment': 'production',
+        'update_mode': 'webhook' if os.getenv('TELEGRAM_WEBHOOK_URL') else 'polling',
         'port': os.getenv('PORT', '5000'),
-        'host': '0.0.0.0'
+        'host': '0.0.0.0',
+        'metrics': '/metrics'
     }), 200
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Метрики в текстовом формате Prometheus"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/webhook', methods=['POST'])
+def telegram_webhook():
+    """Приём обновлений Telegram в webhook-режиме"""
+    bot = bot_instance
+    if bot is None:
+        return jsonify({'ok': False, 'error': 'bot_not_running'}), 503
+    if not bot.check_webhook_secret(request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')):
+        return jsonify({'ok': False, 'error': 'forbidden'}), 403
+    update = request.get_json(silent=True)
+    if not isinstance(update, dict) or 'update_id' not in update:
+        return jsonify({'ok': False, 'error': 'bad_update'}), 400
+    if not bot.submit_update_threadsafe(update):
+        # Telegram повторит доставку позже
+        return jsonify({'ok': False, 'error': 'busy'}), 503
+    return jsonify({'ok': True}), 200
+
 @app.route('/restart')
 def restart_bot():
     """Restart bot endpoint for troubleshooting"""
@@ -85,6 +113,9 @@ def restart_bot():
     try:
         if bot_instance:
             logger.info("Restarting bot...")
+            # The old bot must close its connections and flush its buffers before the new one starts
+            if not stop_bot():
+                return jsonify({'status': 'error', 'message': 'previous bot did not stop'}), 503
             start_bot_in_thread()
             return jsonify({'status': 'restarted'}), 200
         else:
@@ -113,6 +144,11 @@ async def run_bot_with_enhanced_error_handling():
             
         logger.info("Starting DearCraveBreaker Telegram Bot (PRODUCTION) with enhanced error handling...")
         
+        if bot_instance.webhook_url:
+            # Webhook mode: updates arrive via POST /webhook, polling is the fallback
+            await bot_instance.run_webhook()
+            return
+        
         # Initialize database
         await bot_instance.init_db()
         
@@ -145,6 +181,8 @@ async def run_bot_with_enhanced_error_handling():
     except Exception as e:
         logger.error(f"Critical error in bot: {e}")
     finally:
+        if bot_instance is not None:
+            await bot_instance.close()
         bot_instance = None
 
 def run_bot_async():
@@ -163,16 +201,30 @@ def run_bot_async():
 
 def start_bot_in_thread():
     """Start the bot in a separate thread"""
+    global bot_thread
     bot_thread = threading.Thread(target=run_bot_async, daemon=True)
     bot_thread.start()
     logger.info("Production DearCraveBreaker bot thread started with enhanced error handling")
     return bot_thread
 
+def stop_bot(timeout=SHUTDOWN_TIMEOUT):
+    """Ask the bot to stop and wait until close() has flushed buffered events"""
+    bot, thread = bot_instance, bot_thread
+    if bot is not None:
+        bot.stop()
+    if thread is not None and thread.is_alive():
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error(f"Bot did not stop within {timeout:g}s, buffered events may be lost")
+            return False
+    return True
+
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     global running
     logger.info(f"Received signal {signum}, shutting down gracefully...")
     running = False
+    stop_bot()
     sys.exit(0)
 
 def main():
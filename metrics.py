@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Метрики бота в текстовом формате Prometheus
+Гистограммы задержек обработчиков, вызовов Telegram API и SQLite, счётчики ошибок и глубина очередей
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+PREFIX = "cravebreaker_"
+
+# Границы корзин (секунды): от быстрых обработчиков до long polling getUpdates
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Накопительная гистограмма одной серии (count, sum, корзины)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Реестр метрик, общий для бота и HTTP-сервера.
+
+    Запись идёт из event loop бота, чтение (``render``) - из потока Flask,
+    поэтому все изменения под одной блокировкой. Значения очередей и других
+    состояний снимаются в момент запроса функциями, зарегистрированными
+    через ``gauge``.
+    """
+
+    def __init__(self, prefix: str = PREFIX):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._callbacks: Dict[str, Tuple[Callable, Optional[str]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """Тип и описание метрики для строк # TYPE и # HELP"""
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Замер блока в гистограмму name; исключение дополнительно считается в <name>_errors_total"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - started, **labels)
+
+    def gauge(self, name: str, help_text: str, fn: Callable, label: Optional[str] = None,
+              kind: str = "gauge"):
+        """Значение, снимаемое при каждом запросе /metrics.
+
+        ``fn()`` возвращает число, а при заданном ``label`` - словарь
+        {значение метки: число}. Повторная регистрация заменяет функцию
+        (бот может быть пересоздан после перезапуска).
+        """
+        self.describe(name, kind, help_text)
+        with self._lock:
+            self._callbacks[name] = (fn, label)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus (version 0.0.4)"""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+            callbacks = dict(self._callbacks)
+
+        lines: List[str] = []
+
+        def header(name: str, default_kind: str):
+            kind, help_text = self._help.get(name, (default_kind, ""))
+            if help_text:
+                lines.append(f"# HELP {self.prefix}{name} {help_text}")
+            lines.append(f"# TYPE {self.prefix}{name} {kind}")
+
+        for name in sorted(counters):
+            header(name, "counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{self.prefix}{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name in sorted(histograms):
+            header(name, "histogram")
+            for key, (buckets, counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = 'le="{}"'.format(_format_value(bound))
+                    lines.append(f"{self.prefix}{name}_bucket{_format_labels(key, le)} {cumulative}")
+                lines.append(f"{self.prefix}{name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.prefix}{name}_count{_format_labels(key)} {count}")
+
+        for name in sorted(callbacks):
+            fn, label = callbacks[name]
+            try:
+                value = fn()
+            except Exception:
+                continue
+            header(name, "gauge")
+            if label is None:
+                lines.append(f"{self.prefix}{name} {_format_value(value)}")
+            else:
+                for label_value, number in sorted(value.items()):
+                    lines.append(f"{self.prefix}{name}{_format_labels(((label, label_value),))} {_format_value(number)}")
+
+        return "\n".join(lines) + "\n"
+
+    def total(self, name: str) -> float:
+        """Сумма счётчика по всем меткам"""
+        with self._lock:
+            return sum(self._counters.get(name, {}).values())
+
+    def reset(self):
+        """Сбросить все накопленные значения (бенчмарки, нагрузочные тесты)"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
+
+metrics.describe("handler_seconds", "histogram", "Время обработки обновления по маршруту")
+metrics.describe("handler_errors_total", "counter", "Исключения в обработчиках по маршруту")
+metrics.describe("telegram_request_seconds", "histogram", "Время запроса к Telegram Bot API")
+metrics.describe("telegram_errors_total", "counter", "Ошибки Telegram Bot API (HTTP-статус или тип исключения)")
+metrics.describe("db_wait_seconds", "histogram", "Ожидание соединения SQLite (блокировка писателя или пул читателей)")
+metrics.describe("db_seconds", "histogram", "Время удержания соединения SQLite (транзакция или чтение)")
+metrics.describe("db_errors_total", "counter", "Откаченные транзакции и ошибки чтения SQLite")
+metrics.describe("event_sink_flush_seconds", "histogram", "Время групповой записи событий")
+metrics.describe("event_sink_events_total", "counter", "События, записанные буфером")
+metrics.describe("event_sink_errors_total", "counter", "Неудачные групповые записи (переход на запись по одному)")
+metrics.describe("dispatcher_errors_total", "counter", "Необработанные исключения в воркерах диспетчера")
+metrics.describe("callback_acks_dropped_total", "counter", "Ответы на callback query, устаревшие в очереди")
+metrics.describe("outbound_queue_seconds", "histogram", "Ожидание исходящего запроса в очереди планировщика по полосе")
+metrics.describe("outbound_retries_total", "counter", "Повторы исходящих запросов (429, 5xx, сетевые ошибки)")
+metrics.describe("outbound_dropped_total", "counter", "Исходящие запросы, не отправленные после всех попыток")
+metrics.describe("broadcast_messages_total", "counter", "Сообщения утренней рассылки по результату (sent, failed, blocked)")
+
+
+# Доля отладочных сообщений горячего пути, которые попадают в лог
+DEBUG_LOG_SAMPLE_RATE = float(os.getenv("DEBUG_LOG_SAMPLE_RATE", "0.01"))
+
+
+def debug_sampled(log: logging.Logger, message: str, *args):
+    """logger.debug для горячего пути: только при уровне DEBUG и с вероятностью DEBUG_LOG_SAMPLE_RATE"""
+    if log.isEnabledFor(logging.DEBUG) and random.random() < DEBUG_LOG_SAMPLE_RATE:
+        log.debug(message, *args)
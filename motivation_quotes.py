@@ -6,30 +6,43 @@ Personalized Daily Motivation Quotes Generator for CraveBreaker
 Generates contextual motivational quotes based on user progress and current state
 """
 
+import asyncio
 import random
 import json
+import logging
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-# OpenAI integration for advanced personalization
-try:
-    from openai import OpenAI
-    OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-    openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-except ImportError:
-    openai_client = None
+# AI integration for advanced personalization: backend is pluggable (OpenAI / offline stand-in)
+from llm_backends import CompletionBackend, create_backend_from_env
+
+logger = logging.getLogger(__name__)
+
+# Дедлайн одного запроса к AI и число одновременных запросов
+OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", "4"))
+OPENAI_MAX_CONCURRENCY = int(os.environ.get("OPENAI_MAX_CONCURRENCY", "4"))
 
 class MotivationQuotesGenerator:
     """Generates personalized motivational quotes based on user context"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[CompletionBackend] = None):
         self.base_quotes = self._initialize_base_quotes()
         self.streak_quotes = self._initialize_streak_quotes()
         self.milestone_quotes = self._initialize_milestone_quotes()
         self.time_based_quotes = self._initialize_time_based_quotes()
         self.comeback_quotes = self._initialize_comeback_quotes()
         
+        self.backend = backend if backend is not None else create_backend_from_env()
+        self.ai_timeout = OPENAI_TIMEOUT
+        self.ai_concurrency = OPENAI_MAX_CONCURRENCY
+        # Счётчики AI-пути: запросы, успешные ответы, таймауты, отказ из-за занятых слотов, ошибки
+        self.ai_stats = {"requests": 0, "completed": 0, "timeouts": 0, "busy": 0, "errors": 0}
+        
+        # Семафор привязан к event loop - создаётся лениво в том loop, где используется
+        self._ai_slots: Optional[asyncio.Semaphore] = None
+        self._ai_loop: Optional[asyncio.AbstractEventLoop] = None
+        
     def _initialize_base_quotes(self) -> List[str]:
         """Base motivational quotes for general use"""
         return [
@@ -271,20 +284,25 @@ class MotivationQuotesGenerator:
         
         if is_comeback:
             base_quote = random.choice(self.comeback_quotes)
-        elif current_streak == 0:
-            base_quote = random.choice(self.streak_quotes["new_streak"])
-        elif current_streak <= 6:
-            base_quote = random.choice(self.streak_quotes["short_streak"])
-        elif current_streak <= 20:
-            base_quote = random.choice(self.streak_quotes["medium_streak"])
         else:
-            base_quote = random.choice(self.streak_quotes["long_streak"])
+            base_quote = random.choice(self.streak_quotes[self.streak_bucket(current_streak)])
         
         # Add personalized stats
         stats_addition = self._get_stats_addition(user_progress)
         
         return f"{base_quote}\n\n{stats_addition}"
     
+    @staticmethod
+    def streak_bucket(current_streak: int) -> str:
+        """Группа серии: new_streak / short_streak / medium_streak / long_streak"""
+        if current_streak == 0:
+            return "new_streak"
+        elif current_streak <= 6:
+            return "short_streak"
+        elif current_streak <= 20:
+            return "medium_streak"
+        return "long_streak"
+    
     def get_contextual_quote(self, user_progress: Dict, context: str = "general") -> str:
         """Get quote based on current context"""
         hour = datetime.now().hour
@@ -318,6 +336,10 @@ class MotivationQuotesGenerator:
         
         return f"{base_quote}\n\n{stats_addition}"
     
+    def detect_milestone(self, user_progress: Dict) -> str:
+        """Public alias used by the quote pool key"""
+        return self._detect_milestone(user_progress)
+    
     def _detect_milestone(self, user_progress: Dict) -> str:
         """Detect if user just reached a milestone"""
         total = user_progress.get("total_interventions", 0)
@@ -333,6 +355,10 @@ class MotivationQuotesGenerator:
         else:
             return "general"
     
+    def format_with_stats(self, quote: str, user_progress: Dict) -> str:
+        """Quote followed by the user's personal stats line"""
+        return f"{quote}\n\n{self._get_stats_addition(user_progress)}"
+    
     def _get_stats_addition(self, user_progress: Dict) -> str:
         """Add personalized stats to quote"""
         current_streak = user_progress.get("current_streak", 0)
@@ -361,9 +387,48 @@ class MotivationQuotesGenerator:
         
         return random.choice(challenges)
     
+    @property
+    def ai_enabled(self) -> bool:
+        return self.backend is not None
+    
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._ai_loop is not loop:
+            self._ai_slots = asyncio.Semaphore(self.ai_concurrency)
+            self._ai_loop = loop
+        return self._ai_slots
+    
+    async def _complete(self, messages: List[Dict], max_tokens: int, temperature: float) -> Optional[str]:
+        """Запрос к AI-бэкенду с дедлайном; None - использовать подобранные цитаты.
+        
+        Если все слоты заняты, в очередь не встаём: ответ пользователю важнее AI-цитаты.
+        """
+        self.ai_stats["requests"] += 1
+        slots = self._slots()
+        if slots.locked():
+            self.ai_stats["busy"] += 1
+            return None
+        async with slots:
+            try:
+                content = await asyncio.wait_for(
+                    self.backend.complete(messages, max_tokens, temperature),
+                    timeout=self.ai_timeout
+                )
+            except asyncio.TimeoutError:
+                self.ai_stats["timeouts"] += 1
+                logger.warning(f"AI quote timed out after {self.ai_timeout}s, using curated quote")
+                return None
+            except Exception:
+                self.ai_stats["errors"] += 1
+                raise
+        if not content:
+            return None
+        self.ai_stats["completed"] += 1
+        return content.strip()
+    
     async def get_ai_personalized_quote(self, user_progress: Dict, context: str = "general") -> Optional[str]:
         """Generate AI-powered personalized quote using OpenAI"""
-        if not openai_client:
+        if not self.ai_enabled:
             return None
             
         try:
@@ -396,9 +461,8 @@ class MotivationQuotesGenerator:
 
 Создай уникальную цитату именно для этого пользователя:"""
 
-            response = openai_client.chat.completions.create(
-                model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-                messages=[
+            return await self._complete(
+                [
                     {"role": "system", "content": "Ты эксперт по мотивационному коучингу. Создаешь персонализированные цитаты для людей, борющихся с вредными привычками."},
                     {"role": "user", "content": prompt}
                 ],
@@ -406,28 +470,72 @@ class MotivationQuotesGenerator:
                 temperature=0.8
             )
             
-            ai_quote = response.choices[0].message.content
-            return ai_quote.strip() if ai_quote else None
-            
         except Exception as e:
             print(f"Error generating AI quote: {e}")
             return None
     
+    async def get_ai_bucket_quote(self, context: str, streak_bucket: str, milestone: str) -> Optional[str]:
+        """AI quote for a group of users (for the quote pool): no exact numbers in the text"""
+        if not self.ai_enabled:
+            return None
+        
+        streak_descriptions = {
+            "new_streak": "серия только начинается (0 дней)",
+            "short_streak": "короткая серия (1-6 дней)",
+            "medium_streak": "уверенная серия (7-20 дней)",
+            "long_streak": "длинная серия (больше 20 дней)",
+        }
+        milestone_descriptions = {
+            "first_intervention": "только что справился с первым импульсом",
+            "interventions_10": "только что достиг 10 интервенций",
+            "interventions_50": "только что достиг 50 интервенций",
+            "interventions_100": "только что достиг 100 интервенций",
+        }
+        
+        try:
+            prompt = f"""Создай мотивационную цитату на русском языке для пользователя приложения по борьбе с вредными привычками.
+
+Контекст пользователя:
+- Серия: {streak_descriptions.get(streak_bucket, streak_bucket)}
+- Веха: {milestone_descriptions.get(milestone, 'нет')}
+- Ситуация: {context}
+
+Требования к цитате:
+1. Длина: 20-40 слов
+2. Тон: поддерживающий, мотивирующий, но не навязчивый
+3. Не называй точных чисел - статистика пользователя добавляется отдельно
+4. Формат: одно предложение с эмодзи в начале
+5. Избегай банальностей, будь оригинальным
+
+Создай уникальную цитату:"""
+
+            return await self._complete(
+                [
+                    {"role": "system", "content": "Ты эксперт по мотивационному коучингу. Создаешь персонализированные цитаты для людей, борющихся с вредными привычками."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=100,
+                temperature=0.9
+            )
+            
+        except Exception as e:
+            logger.warning(f"Error generating AI pool quote: {e}")
+            return None
+    
     async def get_enhanced_personalized_quote(self, user_progress: Dict, context: str = "general") -> str:
         """Get enhanced personalized quote with AI fallback to curated quotes"""
         # Try AI-generated quote first
-        if openai_client:
+        if self.ai_enabled:
             ai_quote = await self.get_ai_personalized_quote(user_progress, context)
             if ai_quote:
-                stats_addition = self._get_stats_addition(user_progress)
-                return f"{ai_quote}\n\n{stats_addition}"
+                return self.format_with_stats(ai_quote, user_progress)
         
         # Fallback to curated contextual quotes
         return self.get_contextual_quote(user_progress, context)
     
     async def get_ai_achievement_celebration(self, badge_name: str, user_progress: Dict) -> Optional[str]:
         """Generate AI-powered achievement celebration message"""
-        if not openai_client:
+        if not self.ai_enabled:
             return None
             
         try:
@@ -453,9 +561,8 @@ class MotivationQuotesGenerator:
 
 Создай уникальное поздравление:"""
 
-            response = openai_client.chat.completions.create(
-                model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-                messages=[
+            return await self._complete(
+                [
                     {"role": "system", "content": "Ты мотивационный коуч, который празднует достижения людей в борьбе с вредными привычками."},
                     {"role": "user", "content": prompt}
                 ],
@@ -463,9 +570,6 @@ class MotivationQuotesGenerator:
                 temperature=0.9
             )
             
-            ai_message = response.choices[0].message.content
-            return ai_message.strip() if ai_message else None
-            
         except Exception as e:
             print(f"Error generating AI achievement message: {e}")
             return None
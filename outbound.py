@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Планировщик исходящих сообщений Telegram
+Глобальный и per-chat лимиты частоты, приоритет интерактивных ответов над рассылками, повторы по retry_after
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Optional, Set, Tuple
+
+from metrics import metrics
+from telegram_api import TelegramAPIClient, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Полосы в порядке приоритета
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# Сколько элементов полосы просматривать в поиске чата, которому можно отправлять
+SCAN_LIMIT = 256
+
+
+class _Outbound:
+    __slots__ = ("method", "chat_id", "payload", "body", "lane", "future", "queued_at", "attempts", "not_before")
+
+    def __init__(self, method: str, chat_id, payload: Optional[Dict], body: Optional[bytes],
+                 lane: str, future: asyncio.Future):
+        self.method = method
+        self.chat_id = chat_id
+        self.payload = payload
+        self.body = body
+        self.lane = lane
+        self.future = future
+        self.queued_at = time.monotonic()
+        self.attempts = 0
+        self.not_before = 0.0
+
+
+class OutboundScheduler:
+    """Очередь исходящих запросов с лимитами Telegram.
+
+    Запрос ждёт токен глобального ограничителя (``global_rate`` в секунду)
+    и ограничителя своего чата (``chat_rate`` с запасом ``chat_burst``).
+    Полоса INTERACTIVE (ответы на нажатия) всегда обслуживается раньше BULK
+    (рассылки). В каждом чате одновременно выполняется не больше одного
+    запроса, поэтому сообщения чата приходят по порядку. 429 блокирует
+    чат на ``retry_after`` секунд, 5xx и сетевые ошибки повторяются с
+    экспоненциальной задержкой - до ``max_attempts`` попыток; ответ 4xx
+    возвращается вызывающему как есть.
+    """
+
+    def __init__(self, api: TelegramAPIClient,
+                 global_rate: Optional[float] = None,
+                 chat_rate: Optional[float] = None,
+                 chat_burst: Optional[float] = None,
+                 max_in_flight: Optional[int] = None,
+                 max_attempts: int = 5,
+                 max_chat_buckets: int = 10000):
+        self.api = api
+        self.global_bucket = TokenBucket(global_rate or float(os.getenv("TELEGRAM_GLOBAL_RATE", "30")))
+        self.chat_rate = chat_rate or float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+        self.chat_burst = chat_burst or float(os.getenv("TELEGRAM_CHAT_BURST", "5"))
+        self.max_in_flight = max_in_flight or int(os.getenv("TELEGRAM_MAX_IN_FLIGHT", "20"))
+        self.max_attempts = max_attempts
+        self.max_chat_buckets = max_chat_buckets
+        self._lanes: Dict[str, Deque[_Outbound]] = {lane: deque() for lane in LANES}
+        self._chats: Dict[object, TokenBucket] = {}
+        self._busy: Set[object] = set()
+        self._in_flight: Set[asyncio.Task] = set()
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def pending(self, lane: Optional[str] = None) -> int:
+        """Запросы в очереди (всех полос или одной)"""
+        if lane is not None:
+            return len(self._lanes[lane])
+        return sum(len(queue) for queue in self._lanes.values())
+
+    async def send(self, method: str, chat_id, payload: Optional[Dict] = None,
+                   body: Optional[bytes] = None, lane: str = INTERACTIVE) -> Optional[Dict]:
+        """Поставить запрос в очередь и дождаться ответа Telegram (JSON) или None после всех попыток"""
+        future = asyncio.get_running_loop().create_future()
+        self._lanes[lane].append(_Outbound(method, chat_id, payload, body, lane, future))
+        self._wake()
+        return await future
+
+    def _wake(self):
+        if self._task is None or self._task.done():
+            # Запуск при первом запросе - в том event loop, где работает бот
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._schedule(), name="outbound")
+        self._wakeup.set()
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chat_buckets:
+                # Забываем чаты с полным запасом - их состояние совпадает с новым
+                self._chats = {key: value for key, value in self._chats.items() if not value.idle}
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def _next_ready(self) -> Tuple[Optional[_Outbound], Optional[float]]:
+        """Первый запрос, который можно отправить сейчас, иначе (None, сколько ждать)"""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return None, self._paused_until - now
+        if len(self._in_flight) >= self.max_in_flight:
+            return None, None
+        global_delay = self.global_bucket.delay()
+        if global_delay > 0:
+            return None, global_delay
+
+        wait = None
+        for lane in LANES:
+            queue = self._lanes[lane]
+            blocked = set(self._busy)
+            for index, item in enumerate(islice(queue, SCAN_LIMIT)):
+                if item.future.done():
+                    # Вызывающий отменил ожидание
+                    del queue[index]
+                    return self._next_ready()
+                if item.chat_id is not None and item.chat_id in blocked:
+                    continue
+                delay = item.not_before - now
+                if item.chat_id is not None:
+                    delay = max(delay, self._chat_bucket(item.chat_id).delay())
+                if delay > 0:
+                    # Следующие сообщения этого чата не должны обогнать текущее
+                    if item.chat_id is not None:
+                        blocked.add(item.chat_id)
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                del queue[index]
+                if item.chat_id is not None:
+                    self._chat_bucket(item.chat_id).try_acquire()
+                self.global_bucket.try_acquire()
+                return item, 0.0
+        return None, wait
+
+    async def _schedule(self):
+        while True:
+            item, wait = self._next_ready()
+            if item is None:
+                self._wakeup.clear()
+                # asyncio.wait, а не wait_for: отмена при stop() не должна теряться
+                waiter = asyncio.ensure_future(self._wakeup.wait())
+                try:
+                    await asyncio.wait({waiter}, timeout=wait)
+                finally:
+                    waiter.cancel()
+                continue
+            if item.chat_id is not None:
+                self._busy.add(item.chat_id)
+            task = asyncio.create_task(self._deliver(item))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _deliver(self, item: _Outbound):
+        item.attempts += 1
+        metrics.observe("outbound_queue_seconds", time.monotonic() - item.queued_at, lane=item.lane)
+        retry_after = None
+        result = None
+        try:
+            if item.body is not None:
+                response = await self.api.post_raw(item.method, item.body)
+            else:
+                response = await self.api.post(item.method, item.payload)
+            status = response.status_code
+            try:
+                result = response.json()
+            except ValueError:
+                result = None
+            if status == 429:
+                parameters = (result or {}).get("parameters") or {}
+                retry_after = float(parameters.get("retry_after", 1))
+                reason = "429"
+            elif status >= 500 or result is None:
+                reason = str(status)
+            else:
+                reason = None
+        except Exception as e:
+            logger.warning(f"{item.method} в чат {item.chat_id}: {e!r}")
+            reason = type(e).__name__
+
+        try:
+            if reason is None:
+                if not item.future.done():
+                    item.future.set_result(result)
+                return
+            if item.attempts >= self.max_attempts:
+                metrics.inc("outbound_dropped_total", lane=item.lane)
+                logger.error(f"{item.method} в чат {item.chat_id} не отправлен после {item.attempts} попыток ({reason})")
+                if not item.future.done():
+                    item.future.set_result(result)
+                return
+            metrics.inc("outbound_retries_total", reason=reason)
+            if retry_after is not None:
+                if item.chat_id is not None:
+                    self._chat_bucket(item.chat_id).block(retry_after)
+                else:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                logger.warning(f"429 для чата {item.chat_id}: повтор через {retry_after:g} с")
+            else:
+                item.not_before = time.monotonic() + random.uniform(0, min(30.0, 0.5 * 2 ** item.attempts))
+            # В начало полосы: порядок сообщений чата сохраняется
+            self._lanes[item.lane].appendleft(item)
+        finally:
+            self._busy.discard(item.chat_id)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    async def stop(self, timeout: float = 10.0):
+        """Дождаться отправки очереди (не дольше timeout), затем остановиться"""
+        deadline = time.monotonic() + timeout
+        while (self.pending() or self._in_flight) and time.monotonic() < deadline and \
+                self._task is not None and not self._task.done():
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        lost = 0
+        for queue in self._lanes.values():
+            while queue:
+                item = queue.popleft()
+                if not item.future.done():
+                    item.future.set_result(None)
+                    lost += 1
+        if lost:
+            metrics.inc("outbound_dropped_total", lost, lane="shutdown")
+            logger.error(f"При остановке не отправлено исходящих сообщений: {lost}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Пул заранее сгенерированных AI-цитат
+Цитаты по ключу (контекст, группа серии, веха) готовятся в фоне и выдаются без ожидания OpenAI
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from db_pool import ConnectionManager
+from event_sink import EventSink
+from motivation_quotes import MotivationQuotesGenerator
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str, str]
+
+
+class QuotePool:
+    """Пул AI-цитат с фоновым пополнением.
+
+    Запрос берёт случайную свежую цитату своего ключа; если её нет -
+    сразу подобранную цитату из get_contextual_quote, а ключ попадает в
+    очередь на пополнение. Каждая цитата выдаётся не больше ``max_uses``
+    раз и живёт ``ttl`` секунд. Пул хранится в таблице ai_quote_pool и
+    переживает перезапуск.
+    """
+
+    def __init__(self, generator: MotivationQuotesGenerator, db: ConnectionManager,
+                 sink: Optional[EventSink] = None,
+                 target_size: Optional[int] = None,
+                 max_uses: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 refill_interval: Optional[float] = None):
+        self.generator = generator
+        self.db = db
+        self.sink = sink
+        self.target_size = target_size or int(os.getenv("QUOTE_POOL_SIZE", "5"))
+        self.max_uses = max_uses or int(os.getenv("QUOTE_POOL_MAX_USES", "20"))
+        self.ttl = ttl or float(os.getenv("QUOTE_POOL_TTL", "86400"))
+        self.refill_interval = refill_interval or float(os.getenv("QUOTE_POOL_REFILL_INTERVAL", "30"))
+        # ключ -> [id, цитата, истекает (unix time), осталось выдач]
+        self._quotes: Dict[PoolKey, List[list]] = {}
+        self._wanted: Set[PoolKey] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._table_ready = False
+
+    def key_for(self, user_progress: Dict, context: str) -> PoolKey:
+        streak = self.generator.streak_bucket(user_progress.get("current_streak", 0))
+        return (context, streak, self.generator.detect_milestone(user_progress))
+
+    async def _ensure_table(self, db):
+        if self._table_ready:
+            return
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS ai_quote_pool (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                context TEXT NOT NULL,
+                streak_bucket TEXT NOT NULL,
+                milestone TEXT NOT NULL,
+                quote TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                uses_left INTEGER NOT NULL
+            )
+        """)
+        self._table_ready = True
+
+    async def start(self):
+        """Загрузить сохранённый пул и запустить фоновое пополнение"""
+        now = time.time()
+        async with self.db.writer() as db:
+            await self._ensure_table(db)
+            await db.execute(
+                "DELETE FROM ai_quote_pool WHERE expires_at <= ? OR uses_left <= 0", (now,)
+            )
+            cursor = await db.execute(
+                "SELECT id, context, streak_bucket, milestone, quote, expires_at, uses_left FROM ai_quote_pool"
+            )
+            rows = await cursor.fetchall()
+        self._quotes = {}
+        for quote_id, context, streak, milestone, quote, expires_at, uses_left in rows:
+            key = (context, streak, milestone)
+            self._quotes.setdefault(key, []).append([quote_id, quote, expires_at, uses_left])
+            # Ключи, которые уже спрашивали до перезапуска, продолжаем пополнять
+            self._wanted.add(key)
+        logger.info(f"Пул AI-цитат загружен: {len(rows)} цитат, ключей: {len(self._quotes)}")
+
+        if self.generator.ai_enabled and (self._task is None or self._task.done()):
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._refill_periodically(), name="quote-pool")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def size(self, key: PoolKey) -> int:
+        now = time.time()
+        return sum(1 for entry in self._quotes.get(key, ()) if entry[2] > now)
+
+    async def get_quote(self, user_progress: Dict, context: str = "general") -> str:
+        """Цитата с персональной статистикой: из пула или подобранная, без ожидания AI"""
+        key = self.key_for(user_progress, context)
+        quote = await self._take(key)
+        if quote is None:
+            return self.generator.get_contextual_quote(user_progress, context)
+        return self.generator.format_with_stats(quote, user_progress)
+
+    async def _take(self, key: PoolKey) -> Optional[str]:
+        self._wanted.add(key)
+        now = time.time()
+        entries = self._quotes.get(key, [])
+        expired = [entry for entry in entries if entry[2] <= now]
+        for entry in expired:
+            entries.remove(entry)
+            await self._persist_delete(entry[0])
+
+        if len(entries) < self.target_size and self._wakeup is not None:
+            self._wakeup.set()
+        if not entries:
+            return None
+
+        entry = random.choice(entries)
+        entry[3] -= 1
+        if entry[3] <= 0:
+            entries.remove(entry)
+            await self._persist_delete(entry[0])
+        elif self.sink is not None:
+            await self.sink.add("UPDATE ai_quote_pool SET uses_left = ? WHERE id = ?", (entry[3], entry[0]))
+        return entry[1]
+
+    async def _persist_delete(self, quote_id: int):
+        sql, params = "DELETE FROM ai_quote_pool WHERE id = ?", (quote_id,)
+        if self.sink is not None:
+            await self.sink.add(sql, params)
+        else:
+            async with self.db.writer() as db:
+                await db.execute(sql, params)
+
+    async def refill(self) -> int:
+        """Догенерировать цитаты для запрошенных ключей до target_size; возвращает число новых"""
+        added = 0
+        for key in list(self._wanted):
+            while self.size(key) < self.target_size:
+                quote = await self.generator.get_ai_bucket_quote(*key)
+                if not quote:
+                    # OpenAI недоступен или занят - попробуем в следующий раз
+                    return added
+                expires_at = time.time() + self.ttl
+                async with self.db.writer() as db:
+                    await self._ensure_table(db)
+                    cursor = await db.execute(
+                        """INSERT INTO ai_quote_pool (context, streak_bucket, milestone, quote, expires_at, uses_left)
+                           VALUES (?, ?, ?, ?, ?, ?)""",
+                        (*key, quote, expires_at, self.max_uses)
+                    )
+                    quote_id = cursor.lastrowid
+                self._quotes.setdefault(key, []).append([quote_id, quote, expires_at, self.max_uses])
+                added += 1
+        return added
+
+    async def _refill_periodically(self):
+        while True:
+            # asyncio.wait, а не wait_for: wait_for может проглотить отмену,
+            # если событие выставлено одновременно с stop()
+            waiter = asyncio.ensure_future(self._wakeup.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=self.refill_interval)
+            finally:
+                waiter.cancel()
+            self._wakeup.clear()
+            try:
+                added = await self.refill()
+                if added:
+                    logger.info(f"Пул AI-цитат пополнен: +{added}")
+            except Exception as e:
+                logger.error(f"Ошибка пополнения пула AI-цитат: {e}")
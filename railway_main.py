@@ -9,9 +9,12 @@ Simplified version specifically for Railway deployment
 import asyncio
 import logging
 import os
+import signal
+import sys
 import threading
 import time
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
+from metrics import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +28,10 @@ app = Flask(__name__)
 
 # Global variables
 bot_instance = None
+bot_thread = None
+
+# How long shutdown waits for the bot to drain queues and flush buffered events
+SHUTDOWN_TIMEOUT = float(os.getenv('BOT_SHUTDOWN_TIMEOUT', '20'))
 
 @app.route('/')
 def health_check():
@@ -44,6 +51,27 @@ def health_check():
 def ping():
     return "pong"
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Metrics in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/webhook', methods=['POST'])
+def telegram_webhook():
+    """Receive Telegram updates in webhook mode"""
+    bot = bot_instance
+    if bot is None:
+        return jsonify({'ok': False, 'error': 'bot_not_running'}), 503
+    if not bot.check_webhook_secret(request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')):
+        return jsonify({'ok': False, 'error': 'forbidden'}), 403
+    update = request.get_json(silent=True)
+    if not isinstance(update, dict) or 'update_id' not in update:
+        return jsonify({'ok': False, 'error': 'bad_update'}), 400
+    if not bot.submit_update_threadsafe(update):
+        # Telegram will retry delivery later
+        return jsonify({'ok': False, 'error': 'busy'}), 503
+    return jsonify({'ok': True}), 200
+
 def start_telegram_bot():
     """Start telegram bot in background"""
     try:
@@ -68,12 +96,26 @@ def start_telegram_bot():
         import traceback
         logger.error(traceback.format_exc())
 
+def signal_handler(signum, frame):
+    """Stop the bot on SIGTERM/SIGINT so close() flushes buffered events before exit"""
+    logger.info(f"Received signal {signum}, shutting down gracefully...")
+    if bot_instance is not None:
+        bot_instance.stop()
+    if bot_thread is not None and bot_thread.is_alive():
+        bot_thread.join(SHUTDOWN_TIMEOUT)
+        if bot_thread.is_alive():
+            logger.error(f"Bot did not stop within {SHUTDOWN_TIMEOUT:g}s, buffered events may be lost")
+    sys.exit(0)
+
 if __name__ == "__main__":
     # Get port from Railway
     port = int(os.getenv('PORT', 5000))
     
     logger.info(f"Starting DearCraveBreaker on Railway, port {port}")
     
+    signal.signal(signal.SIGTERM, signal_handler)
+    signal.signal(signal.SIGINT, signal_handler)
+    
     # Start bot in background thread
     bot_thread = threading.Thread(target=start_telegram_bot, daemon=True)
     bot_thread.start()
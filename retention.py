@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Хранение и уплотнение таблиц событий
+Старые события сворачиваются в дневные итоги по пользователю и удаляются небольшими пачками
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from db_pool import ConnectionManager
+from event_sink import EventSink
+from stats import sql_timestamp, utc_now
+
+logger = logging.getLogger(__name__)
+
+# Как событие каждого вида попадает в user_daily_rollups: (колонки, агрегаты)
+_ROLLUP_KINDS = {
+    "requests": (("requests",), ("COUNT(*)",)),
+    "outcomes": (("attempts", "successes"), ("COUNT(*)", "SUM(COALESCE(success, 0) != 0)")),
+    "triggers": (("triggers",), ("COUNT(*)",)),
+}
+
+
+class RetentionJob:
+    """Периодическая очистка таблиц событий.
+
+    ``tables`` - {таблица: вид события из _ROLLUP_KINDS}. События старше
+    ``retention_days`` сначала добавляются в user_daily_rollups, затем
+    удаляются пачками по ``batch_size`` строк - каждая пачка отдельной
+    короткой транзакцией, чтобы не держать писателя. После очистки
+    освобождённые страницы возвращаются incremental vacuum.
+    Фоновый запуск - раз в сутки в ``hour`` часов (UTC).
+    """
+
+    def __init__(self, db: ConnectionManager, tables: Dict[str, str],
+                 sink: Optional[EventSink] = None,
+                 retention_days: Optional[int] = None,
+                 batch_size: Optional[int] = None,
+                 hour: Optional[int] = None,
+                 vacuum_pages: Optional[int] = None,
+                 pause: float = 0.05):
+        self.db = db
+        self.tables = tables
+        self.sink = sink
+        self.retention_days = retention_days or int(os.getenv("DB_RETENTION_DAYS", "90"))
+        self.batch_size = batch_size or int(os.getenv("DB_RETENTION_BATCH", "500"))
+        self.hour = hour if hour is not None else int(os.getenv("DB_RETENTION_HOUR", "4"))
+        self.vacuum_pages = vacuum_pages if vacuum_pages is not None else int(os.getenv("DB_VACUUM_PAGES", "0"))
+        self.pause = pause
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def create_schema(db):
+        """Таблица дневных итогов (внутри открытой транзакции)"""
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_daily_rollups (
+                user_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                requests INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                triggers INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, day)
+            ) WITHOUT ROWID
+        """)
+
+    async def start(self):
+        """Запуск ежедневной очистки в фоне"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_daily(), name="retention")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _seconds_until_window(self) -> float:
+        now = utc_now()
+        window = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+        if window <= now:
+            window += timedelta(days=1)
+        return (window - now).total_seconds()
+
+    async def _run_daily(self):
+        while True:
+            await asyncio.sleep(self._seconds_until_window())
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Ошибка очистки старых данных: {e}")
+
+    async def run(self, retention_days: Optional[int] = None) -> Dict:
+        """Один проход очистки; возвращает отчёт (удалено строк, освобождено страниц, время)"""
+        days = retention_days or self.retention_days
+        cutoff = sql_timestamp(utc_now() - timedelta(days=days))
+        started = time.monotonic()
+        if self.sink is not None:
+            await self.sink.flush()
+
+        pruned = {}
+        for table, kind in self.tables.items():
+            pruned[table] = await self._prune_table(table, kind, cutoff)
+        freed_pages = await self._vacuum()
+
+        report = {
+            "pruned": pruned,
+            "rows": sum(pruned.values()),
+            "freed_pages": freed_pages,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+        logger.info(
+            f"Очистка данных старше {days} дней: удалено строк {report['rows']} {pruned}, "
+            f"освобождено страниц {freed_pages}, {report['seconds']} с"
+        )
+        return report
+
+    async def _prune_table(self, table: str, kind: str, cutoff: str) -> int:
+        columns, aggregates = _ROLLUP_KINDS[kind]
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in columns)
+        total = 0
+        while True:
+            async with self.db.writer() as db:
+                # Старые строки лежат в начале по rowid - просмотр короткий
+                cursor = await db.execute(
+                    f"SELECT id FROM {table} WHERE created_at < ? ORDER BY id LIMIT ?",
+                    (cutoff, self.batch_size)
+                )
+                ids = [row[0] for row in await cursor.fetchall()]
+                if not ids:
+                    return total
+                params = {"low": ids[0], "high": ids[-1], "cutoff": cutoff}
+                await db.execute(f"""
+                    INSERT INTO user_daily_rollups (user_id, day, {", ".join(columns)})
+                    SELECT user_id, date(created_at), {", ".join(aggregates)}
+                    FROM {table}
+                    WHERE id BETWEEN :low AND :high AND created_at < :cutoff AND user_id IS NOT NULL
+                    GROUP BY user_id, date(created_at)
+                    ON CONFLICT (user_id, day) DO UPDATE SET {updates}
+                """, params)
+                cursor = await db.execute(
+                    f"DELETE FROM {table} WHERE id BETWEEN :low AND :high AND created_at < :cutoff",
+                    params
+                )
+                total += cursor.rowcount
+            # Между пачками даём пройти записям обработчиков
+            await asyncio.sleep(self.pause)
+
+    async def _vacuum(self) -> int:
+        async with self.db.writer() as db:
+            cursor = await db.execute("PRAGMA auto_vacuum")
+            mode = (await cursor.fetchone())[0]
+            cursor = await db.execute("PRAGMA freelist_count")
+            free_before = (await cursor.fetchone())[0]
+            if mode != 2:
+                # База создана до включения incremental: один полный VACUUM переводит режим
+                await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                await db.execute("VACUUM")
+                logger.info("База переведена в режим auto_vacuum = INCREMENTAL")
+                return free_before
+            if free_before:
+                pages = self.vacuum_pages or free_before
+                # Прагма освобождает по странице на шаг - нужно дочитать курсор
+                cursor = await db.execute(f"PRAGMA incremental_vacuum({pages})")
+                await cursor.fetchall()
+            cursor = await db.execute("PRAGMA freelist_count")
+            return free_before - (await cursor.fetchone())[0]
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Статические экраны бота
+Тексты и клавиатуры заранее сериализованы в JSON-тело запроса к Telegram API;
+на каждый запрос подставляются только chat_id и message_id
+"""
+
+import json
+from types import MappingProxyType
+from typing import Dict
+
+_MAIN_MENU_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "🆘 Срочная помощь", "callback_data": "emergency_help"}],
+        [{"text": "🧠 Мои импульсы", "callback_data": "my_impulses"}],
+        [{"text": "💫 Мотивация дня", "callback_data": "daily_motivation"}],
+        [{"text": "👨‍💼 Мой персональный коуч", "callback_data": "coaching_session"}],
+        [{"text": "📊 Моя статистика", "callback_data": "show_stats"}],
+        [{"text": "📖 О DearCraveBreaker", "callback_data": "about"}, {"text": "❓ F.A.Q.", "callback_data": "faq"}]
+    ]
+}
+
+_IMPULSES_MENU_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "🍰 Хочется сладкого", "callback_data": "impulse_sweets"}],
+        [{"text": "🍷 Хочется выпить", "callback_data": "impulse_alcohol"}],
+        [{"text": "🚬 Хочется курить", "callback_data": "impulse_smoking"}],
+        [{"text": "📱 Хочется скроллить", "callback_data": "impulse_scrolling"}],
+        [{"text": "😤 Хочется разозлиться", "callback_data": "impulse_anger"}],
+        [{"text": "🍔 Хочется вредной еды", "callback_data": "impulse_junkfood"}],
+        [{"text": "🛒 Хочется потратить деньги", "callback_data": "impulse_shopping"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_INTERVENTION_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "🫁 Дыхательная техника", "callback_data": "intervention_breathing"}],
+        [{"text": "🧘‍♀️ Медитация и осознанность", "callback_data": "intervention_meditation"}],
+        [{"text": "🤔 Коучинговый вопрос", "callback_data": "intervention_coaching"}],
+        [{"text": "🎮 Отвлекающая игра", "callback_data": "intervention_game"}],
+        [{"text": "🔙 Назад в меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_WELCOME_TEXT = """🎉 **Добро пожаловать в DearCraveBreaker!**
+
+Я ваш помощник в борьбе с навязчивыми привычками и импульсами.
+
+🎯 **Что я умею:**
+• 🆘 Экстренная поддержка при сильном импульсе
+• 📊 Отслеживание вашего прогресса  
+• 🧘‍♀️ Дыхательные техники и упражнения
+• 🤔 Коучинговые вопросы для осознанности
+• 🎮 Отвлекающие мини-игры
+
+Готовы начать путь к лучшей версии себя?"""
+
+_HELP_TEXT = """❓ **Справка DearCraveBreaker**
+
+🎯 **Основные команды:**
+• /start - Начать работу с ботом
+• /menu - Главное меню
+• /help - Эта справка
+• /stats - Ваша статистика
+
+🆘 **В критический момент:**
+Если вы чувствуете сильный импульс - сразу нажимайте "🆘 Экстренная помощь"
+
+💪 **Помните:** Каждое 'нет' импульсу делает вас сильнее!"""
+
+_HELP_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "🆘 Экстренная помощь", "callback_data": "emergency_help"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_MAIN_MENU_TEXT = """🏠 **Главное меню DearCraveBreaker**
+
+💪 Каждое 'нет' импульсу - это 'да' лучшей версии себя!
+
+Выберите действие:"""
+
+_EMERGENCY_HELP_TEXT = "🆘 **Экстренная помощь активирована!**\n\nВыберите тип поддержки:"
+
+_MY_IMPULSES_TEXT = """🧠 **Мои импульсы**
+
+Выберите тип импульса, с которым столкнулись прямо сейчас.
+
+💡 **Помните:** Обращение за помощью - это уже проявление силы воли!
+
+Каждый тип импульса требует особого подхода:"""
+
+_COACHING_SESSION_TEXT = """👨‍💼 **Мой персональный коуч**
+
+👋 **Привет! Я SpotCoach** - сертифицированный коуч, который поможет тебе разобраться с привычками и достичь целей.
+
+🚀 **Выбери, что тебе нужно:**
+
+🎯 **Записаться на сессию** - глубокая работа с привычками
+💬 **Получить онлайн-консультацию** - быстрый совет по ситуации  
+🗣️ **Чисто отвести душу** - просто поговорить и выговориться
+📺 **Перейти в канал пользы** - полезные материалы каждый день
+
+Что выберешь?"""
+
+_COACHING_SESSION_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "🎯 Записаться на сессию", "url": "https://forms.gle/C8Bo6N43AsKMBb2f9"}],
+        [{"text": "💬 Получить онлайн-консультацию", "callback_data": "contact_coach"}],
+        [{"text": "🗣️ Чисто отвести душу", "callback_data": "just_talk"}],
+        [{"text": "📺 Перейти в канал пользы", "url": "https://t.me/SpotCoach"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_BOOK_SESSION_TEXT = """📅 **Запись на персональную коуч-сессию**
+
+🎯 **Что тебя ждет:**
+• Глубокий анализ твоих привычек и паттернов
+• Персональный план изменений
+• Практические инструменты и техники  
+• Поддержка на пути к цели
+
+⏰ **Длительность:** 60-90 минут
+💰 **Стоимость:** обсуждается индивидуально
+
+📝 **Для записи заполни форму или напиши напрямую:**
+
+🎁 **Бонус:** первая консультация 15 минут - бесплатно!"""
+
+_BOOK_SESSION_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "📝 Заполнить форму записи", "url": "https://forms.gle/C8Bo6N43AsKMBb2f9"}],
+        [{"text": "✍️ Написать @SpotCoach", "url": "https://t.me/SpotCoach"}],
+        [{"text": "💬 Связаться онлайн", "callback_data": "contact_coach"}],
+        [{"text": "🔙 К коучинговым услугам", "callback_data": "coaching_session"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_CONTACT_COACH_TEXT = """💬 **Получить онлайн-консультацию**
+
+🎯 **Быстрая помощь от SpotCoach**
+
+**Когда это подходит:**
+• Нужен быстрый совет по конкретной ситуации
+• Возник срочный вопрос о привычках
+• Хочешь получить обратную связь
+• Нужна мотивация прямо сейчас
+
+📱 **Как получить консультацию:**
+Напиши коучу в личку @CoaCerto с пометкой "Онлайн-консультация"
+
+⚡ **Обычно отвечаю в течение нескольких часов**
+
+💡 **Совет:** опиши ситуацию максимально конкретно - так я смогу дать более точный совет"""
+
+_CONTACT_COACH_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "💌 Написать коучу", "url": "https://t.me/CoaCerto"}],
+        [{"text": "🔙 К персональному коучу", "callback_data": "coaching_session"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_JUST_TALK_TEXT = """🗣️ **Чисто отвести душу**
+
+😌 **Иногда просто нужно выговориться...**
+
+Знаю это чувство - когда все наваливается, привычки берут верх, а поделиться не с кем. 
+
+**Здесь безопасное пространство:**
+• Без осуждений и советов (если не просишь)
+• Можешь просто выплеснуть эмоции
+• Расскажи, что на душе
+• Я выслушаю и пойму
+
+💭 **Напиши коучу @CoaCerto** с пометкой "Просто поговорить"
+
+🤗 **Помни:** ты не одинок в своих переживаниях, и то, что ты чувствуешь - нормально"""
+
+_JUST_TALK_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "💭 Написать коучу", "url": "https://t.me/CoaCerto"}],
+        [{"text": "🔙 К персональному коучу", "callback_data": "coaching_session"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_FAQ_TEXT = """❓ **F.A.Q. - Часто задаваемые вопросы**
+
+🎯 **Как работает система прогресса?**
+• **Серии**: Дни подряд с успешными интервенциями (обнуляются при пропуске дня)
+• **Статистика**: Отслеживание всех ваших интервенций и их успешности
+
+🧠 **Как формируются новые привычки?**
+1. **21 день** - начинают формироваться нейронные пути
+2. **66 дней** - привычка становится автоматической (в среднем)
+3. **90 дней** - устойчивая привычка, сложно сломать
+
+💪 **К чему вы идете?**
+• **Самоконтроль становится автоматическим**
+• **Стресс-реакции ослабевают**
+• **Появляется "пауза" между импульсом и действием**
+• **Уверенность в своих силах растет**
+
+💡 **Дополнительные возможности:**
+Изучите статистику использования техник."""
+
+_FAQ_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "📊 Моя статистика", "callback_data": "show_stats"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+_NOT_HELPED_TEXT = """💙 **Не расстраивайтесь! Это нормально.**
+
+Не каждая техника подходит каждому человеку в каждой ситуации. Это важный опыт!
+
+🔍 **Что можно попробовать:**
+• Другую технику из того же раздела
+• Техники из другой категории  
+• Комбинацию нескольких методов
+• Изменить обстановку и попробовать снова
+
+💪 **Главное:** Вы обратились за помощью вместо того, чтобы сразу поддаться импульсу. Это уже победа!"""
+
+_NOT_HELPED_KEYBOARD = {
+    "inline_keyboard": [
+        [{"text": "🔄 Попробовать другую технику", "callback_data": "emergency_help"}],
+        [{"text": "🆘 Экстренная помощь", "callback_data": "emergency_help"}],
+        [{"text": "👨‍💼 Связаться с коучем", "callback_data": "contact_coach"}],
+        [{"text": "📝 Записать что не сработало", "callback_data": "add_note"}],
+        [{"text": "🏠 Главное меню", "callback_data": "back_to_menu"}]
+    ]
+}
+
+
+class Screen:
+    """Экран: текст + клавиатура, сериализованные один раз при импорте"""
+
+    __slots__ = ("name", "text", "reply_markup", "_body")
+
+    def __init__(self, name: str, text: str, reply_markup: Dict):
+        self.name = name
+        self.text = text
+        self.reply_markup = reply_markup
+        payload = {"text": text, "parse_mode": "Markdown", "reply_markup": reply_markup}
+        # Тело без открывающей скобки: к нему приклеиваются chat_id/message_id
+        self._body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")[1:]
+
+    def send_payload(self, chat_id: int) -> bytes:
+        """JSON-тело sendMessage"""
+        return b'{"chat_id":%d,' % chat_id + self._body
+
+    def edit_payload(self, chat_id: int, message_id: int) -> bytes:
+        """JSON-тело editMessageText"""
+        return b'{"chat_id":%d,"message_id":%d,' % (chat_id, message_id) + self._body
+
+    def keyboard(self) -> Dict:
+        """Новая копия клавиатуры (для экранов, собираемых вокруг неё)"""
+        return json.loads(json.dumps(self.reply_markup))
+
+
+SCREENS = MappingProxyType({
+    "welcome": Screen("welcome", _WELCOME_TEXT, _MAIN_MENU_KEYBOARD),
+    "help": Screen("help", _HELP_TEXT, _HELP_KEYBOARD),
+    "main_menu": Screen("main_menu", _MAIN_MENU_TEXT, _MAIN_MENU_KEYBOARD),
+    "emergency_help": Screen("emergency_help", _EMERGENCY_HELP_TEXT, _INTERVENTION_KEYBOARD),
+    "my_impulses": Screen("my_impulses", _MY_IMPULSES_TEXT, _IMPULSES_MENU_KEYBOARD),
+    "coaching_session": Screen("coaching_session", _COACHING_SESSION_TEXT, _COACHING_SESSION_KEYBOARD),
+    "book_session": Screen("book_session", _BOOK_SESSION_TEXT, _BOOK_SESSION_KEYBOARD),
+    "contact_coach": Screen("contact_coach", _CONTACT_COACH_TEXT, _CONTACT_COACH_KEYBOARD),
+    "just_talk": Screen("just_talk", _JUST_TALK_TEXT, _JUST_TALK_KEYBOARD),
+    "faq": Screen("faq", _FAQ_TEXT, _FAQ_KEYBOARD),
+    "not_helped": Screen("not_helped", _NOT_HELPED_TEXT, _NOT_HELPED_KEYBOARD),
+})
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Кэш состояний диалога пользователей
+Ограниченный LRU/TTL-кэш в памяти перед таблицей user_states
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from db_pool import ConnectionManager
+from event_sink import EventSink
+
+State = Tuple[Optional[str], Optional[str]]
+
+_NO_STATE: State = (None, None)
+
+
+class UserStateCache:
+    """Состояния диалога: чтение из памяти, запись в user_states.
+
+    Записи попадают в кэш сразу, а в базу - через EventSink (write-behind)
+    или, если sink не передан, напрямую (write-through). При промахе
+    состояние лениво читается из базы - так оно восстанавливается после
+    перезапуска. Отсутствие состояния тоже кэшируется. Своего буфера у кэша
+    нет: при write-behind изменения, ещё не записанные в базу, лежат в
+    EventSink и сохраняются его ``stop()`` при остановке бота (SIGTERM ->
+    bot.stop() -> close()).
+    """
+
+    def __init__(self, db: ConnectionManager, sink: Optional[EventSink] = None,
+                 max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.db = db
+        self.sink = sink
+        self.max_size = max_size or int(os.getenv("USER_STATE_CACHE_SIZE", "10000"))
+        self.ttl = ttl or float(os.getenv("USER_STATE_CACHE_TTL", "3600"))
+        self._entries: "OrderedDict[int, Tuple[State, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, user_id: int, value: State):
+        self._entries[user_id] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _write(self, sql: str, params: tuple):
+        if self.sink is not None:
+            await self.sink.add(sql, params)
+        else:
+            async with self.db.writer() as db:
+                await db.execute(sql, params)
+
+    async def get(self, user_id: int) -> State:
+        """Состояние пользователя (state, data) или (None, None)"""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        if self.sink is not None:
+            # В буфере может лежать ещё не записанное изменение этого пользователя
+            await self.sink.flush()
+        async with self.db.reader() as db:
+            cursor = await db.execute(
+                "SELECT state, data FROM user_states WHERE user_id = ?",
+                (user_id,)
+            )
+            row = await cursor.fetchone()
+        current = self._entries.get(user_id)
+        if current is not None and current is not entry:
+            # Пока читали базу, состояние успели изменить - новее то, что в памяти
+            return current[0]
+        value = (row[0], row[1]) if row else _NO_STATE
+        self._remember(user_id, value)
+        return value
+
+    async def set(self, user_id: int, state: str, data: str = ""):
+        """Установить состояние пользователя"""
+        self._remember(user_id, (state, data))
+        await self._write("""
+            INSERT OR REPLACE INTO user_states (user_id, state, data, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        """, (user_id, state, data))
+
+    async def clear(self, user_id: int):
+        """Сбросить состояние пользователя"""
+        self._remember(user_id, _NO_STATE)
+        await self._write("DELETE FROM user_states WHERE user_id = ?", (user_id,))
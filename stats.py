@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Сервис статистики пользователей
+Дашборды читают материализованные счётчики, история - индексированный диапазон событий
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from db_pool import ConnectionManager
+
+# Формат CURRENT_TIMESTAMP в SQLite (UTC)
+SQL_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_TRIGGER_SEPARATOR = "\x1f"
+
+# Ключ периода в SQL для каждой гранулярности истории
+_BUCKET_SQL = {
+    "day": "date(created_at)",
+    "week": "date(created_at, 'weekday 0', '-6 days')",  # понедельник недели
+    "month": "strftime('%Y-%m', created_at)",
+}
+
+
+def sql_timestamp(moment: datetime) -> str:
+    """datetime -> строка, сравнимая с колонками DEFAULT CURRENT_TIMESTAMP"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime(SQL_TIMESTAMP_FORMAT)
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_keys(today: date, periods: int, bucket: str = "day") -> List[str]:
+    """Ключи ``periods`` последних периодов от старых к новым (в формате _BUCKET_SQL)"""
+    if bucket == "day":
+        return [(today - timedelta(days=i)).isoformat() for i in range(periods - 1, -1, -1)]
+    if bucket == "week":
+        monday = today - timedelta(days=today.weekday())
+        return [(monday - timedelta(weeks=i)).isoformat() for i in range(periods - 1, -1, -1)]
+    if bucket == "month":
+        keys = []
+        year, month = today.year, today.month
+        for _ in range(periods):
+            keys.append(f"{year:04d}-{month:02d}")
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        return list(reversed(keys))
+    raise ValueError(f"Неизвестная гранулярность: {bucket}")
+
+
+class StatsService:
+    """Статистика пользователя за один round-trip.
+
+    Дашборды читают счётчики counters.UserCounters, история по периодам
+    считается по сырым событиям. ``outcomes_table`` - таблица результатов интервенций: ``interventions``
+    у бота, ``intervention_outcomes`` у Database.
+    """
+
+    def __init__(self, db: ConnectionManager, outcomes_table: str = "interventions"):
+        self.db = db
+        self.outcomes_table = outcomes_table
+
+    @staticmethod
+    async def create_indexes(db, outcomes_table: str = "interventions"):
+        """Покрывающие индексы для выборок по пользователю (внутри открытой транзакции)"""
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_help_requests_user "
+            "ON help_requests (user_id, created_at)"
+        )
+        await db.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{outcomes_table}_user "
+            f"ON {outcomes_table} (user_id, created_at, success)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_user_triggers_user "
+            "ON user_triggers (user_id, created_at)"
+        )
+
+    async def get_user_summary(self, user_id: int, days: int = 7) -> Dict:
+        """Все счётчики пользователя (всего и за последние ``days`` дней) одним запросом.
+
+        Итоги берутся из user_counters, период - из user_daily_counters
+        (не больше COUNTER_DAYS дней), всё по первичным ключам.
+        """
+        since = (utc_now().date() - timedelta(days=days - 1)).isoformat()
+        async with self.db.reader() as db:
+            cursor = await db.execute("""
+                SELECT
+                    COALESCE(c.requests, 0), COALESCE(c.attempts, 0), COALESCE(c.successes, 0),
+                    (SELECT COALESCE(SUM(requests), 0) FROM user_daily_counters
+                        WHERE user_id = :user_id AND day >= :since),
+                    (SELECT COALESCE(SUM(successes), 0) FROM user_daily_counters
+                        WHERE user_id = :user_id AND day >= :since),
+                    (SELECT created_at FROM users WHERE user_id = :user_id),
+                    (SELECT group_concat(trigger_name, :separator) FROM (
+                        SELECT trigger_name FROM user_triggers
+                        WHERE user_id = :user_id ORDER BY created_at
+                    ))
+                FROM (SELECT :user_id AS user_id) AS k
+                LEFT JOIN user_counters AS c ON c.user_id = k.user_id
+            """, {"user_id": user_id, "since": since, "separator": _TRIGGER_SEPARATOR})
+            row = await cursor.fetchone()
+
+        total_interventions = row[1]
+        successful = row[2]
+        return {
+            'total_requests': row[0],
+            'total_interventions': total_interventions,
+            'successful_interventions': successful,
+            'weekly_requests': row[3],
+            'weekly_successes': row[4],
+            'triggers': row[6].split(_TRIGGER_SEPARATOR) if row[6] else [],
+            'registration_date': row[5],
+            'success_rate': (successful / total_interventions * 100) if total_interventions > 0 else 0
+        }
+
+    async def get_history(self, user_id: int, periods: int = 7,
+                          bucket: str = "day") -> List[Tuple[str, int, int]]:
+        """Обращения и успешные интервенции по периодам (day/week/month).
+
+        Один запрос по диапазону ``created_at`` (индекс user_id, created_at)
+        с GROUP BY периоду; события, уже свёрнутые RetentionJob, берутся из
+        user_daily_rollups. Периоды без событий дополняются нулями.
+        """
+        keys = bucket_keys(utc_now().date(), periods, bucket)
+        if not keys:
+            return []
+        key_sql = _BUCKET_SQL[bucket]
+        since = keys[0] if bucket != "month" else f"{keys[0]}-01"
+
+        async with self.db.reader() as db:
+            cursor = await db.execute(f"""
+                SELECT {key_sql} AS period, SUM(requests), SUM(successes)
+                FROM (
+                    SELECT created_at, 1 AS requests, 0 AS successes FROM help_requests
+                    WHERE user_id = :user_id AND created_at >= :since
+                    UNION ALL
+                    SELECT created_at, 0, COALESCE(success, 0) != 0 FROM {self.outcomes_table}
+                    WHERE user_id = :user_id AND created_at >= :since
+                    UNION ALL
+                    SELECT day, requests, successes FROM user_daily_rollups
+                    WHERE user_id = :user_id AND day >= :since
+                )
+                GROUP BY period
+            """, {"user_id": user_id, "since": since})
+            counts = {row[0]: (row[1], row[2]) for row in await cursor.fetchall()}
+
+        return [(key, *counts.get(key, (0, 0))) for key in keys]
+
+    async def get_progress_summary(self, user_id: int) -> Optional[Dict]:
+        """Прогресс из user_progress вместе с числом успешных интервенций (для /stats)"""
+        async with self.db.reader() as db:
+            cursor = await db.execute("""
+                SELECT p.total_interventions, p.current_streak, p.longest_streak, p.level, p.xp,
+                       COALESCE(c.successes, 0)
+                FROM user_progress AS p
+                LEFT JOIN user_counters AS c ON c.user_id = p.user_id
+                WHERE p.user_id = ?
+            """, (user_id,))
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        return {
+            'total_interventions': row[0],
+            'current_streak': row[1],
+            'longest_streak': row[2],
+            'level': row[3],
+            'xp': row[4],
+            'successful_interventions': row[5]
+        }
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Клиент Telegram Bot API
+Один долгоживущий httpx.AsyncClient с пулом keep-alive соединений на весь бот
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from metrics import metrics
+
+try:
+    import h2  # noqa: F401  (нужен httpx для HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+
+class ExponentialBackoff:
+    """Экспоненциальная задержка с полным jitter для повторов после ошибок"""
+
+    def __init__(self, base: float = 1.0, maximum: float = 60.0):
+        self.base = base
+        self.maximum = maximum
+        self.failures = 0
+
+    def next_delay(self) -> float:
+        """Задержка перед следующей попыткой: случайная в [0, min(max, base * 2^n))"""
+        cap = min(self.maximum, self.base * (2 ** self.failures))
+        self.failures += 1
+        return random.uniform(0, cap)
+
+    def reset(self):
+        self.failures = 0
+
+
+class TokenBucket:
+    """Ограничитель частоты: ``rate`` операций в секунду с запасом до ``burst``"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Через сколько секунд появится токен (0 - уже есть)"""
+        self._refill()
+        wait = self._blocked_until - self._updated
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self.rate)
+        return max(0.0, wait)
+
+    @property
+    def idle(self) -> bool:
+        """Запас полон и нет блокировки - состояние можно забыть"""
+        return self.delay() == 0 and self._tokens >= self.burst
+
+    def try_acquire(self) -> bool:
+        """Взять токен, если он есть, не ожидая"""
+        if self.delay() > 0:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def acquire(self):
+        """Дождаться токена"""
+        while not self.try_acquire():
+            await asyncio.sleep(self.delay())
+
+    def block(self, seconds: float):
+        """Не выдавать токены seconds секунд (ответ 429 с retry_after)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 0.0)
+
+
+class TelegramAPIClient:
+    """Пул соединений к api.telegram.org, общий для всех вызовов бота.
+
+    Клиент создаётся лениво в том event loop, где выполняется первый запрос
+    (бот запускается в отдельном потоке со своим loop), и закрывается через close().
+    """
+
+    def __init__(self, token: str, api_url: Optional[str] = None,
+                 max_connections: Optional[int] = None,
+                 max_keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: float = 30.0,
+                 timeout: Optional[float] = None,
+                 connect_timeout: float = 5.0,
+                 http2: Optional[bool] = None):
+        api_url = (api_url or os.getenv("TELEGRAM_API_URL", TELEGRAM_API_URL)).rstrip("/")
+        self.base_url = f"{api_url}/bot{token}"
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("TELEGRAM_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=max_keepalive_connections or int(os.getenv("TELEGRAM_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            timeout or float(os.getenv("TELEGRAM_TIMEOUT", "10")),
+            connect=connect_timeout
+        )
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2
+            )
+            logger.info(f"Создан пул соединений Telegram API (HTTP/2: {self.http2})")
+        return self._client
+
+    async def _request(self, http_method: str, method: str, **kwargs) -> httpx.Response:
+        """Запрос с учётом в метриках telegram_request_seconds / telegram_errors_total"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(http_method, f"/{method}", **kwargs)
+        except Exception as e:
+            metrics.inc("telegram_errors_total", method=method, reason=type(e).__name__)
+            raise
+        finally:
+            metrics.observe("telegram_request_seconds", time.perf_counter() - started, method=method)
+        if response.status_code >= 400:
+            metrics.inc("telegram_errors_total", method=method, reason=str(response.status_code))
+        return response
+
+    async def post(self, method: str, payload: Optional[Dict] = None,
+                   timeout: Optional[float] = None) -> httpx.Response:
+        """POST-запрос к методу Bot API"""
+        kwargs = {"json": payload} if payload is not None else {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return await self._request("POST", method, **kwargs)
+
+    async def post_raw(self, method: str, body: bytes,
+                       timeout: Optional[float] = None) -> httpx.Response:
+        """POST с готовым JSON-телом (заранее сериализованные экраны)"""
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        return await self._request(
+            "POST", method, content=body,
+            headers={"Content-Type": "application/json"}, **kwargs
+        )
+
+    async def get(self, method: str, params: Optional[Dict] = None,
+                  timeout: Optional[float] = None) -> httpx.Response:
+        """GET-запрос к методу Bot API"""
+        kwargs = {"params": params} if params is not None else {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return await self._request("GET", method, **kwargs)
+
+    async def close(self):
+        """Закрыть все соединения пула"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Пул соединений Telegram API закрыт")
+        self._client = None